@@ -1,7 +1,21 @@
 """Accessibility features: zoom, high contrast, ATK."""
+import time
+
 import gi
 gi.require_version('Gtk', '4.0')
-from gi.repository import Gtk, Gdk, Gio
+from gi.repository import Gtk, Gdk, Gio, GLib
+
+# Zoom is quantized to these steps so each one's stylesheet is parsed once.
+ZOOM_STEPS = [round(0.5 + 0.1 * i, 1) for i in range(26)]  # 0.5 … 3.0
+DEFAULT_STEP = ZOOM_STEPS.index(1.0)
+# Held-down zoom keys repeat far faster than a slow PC can restyle.
+APPLY_INTERVAL_MS = 120
+
+_HIGH_CONTRAST_CSS = """
+window.high-contrast {
+    border: 2px solid @accent_color;
+    font-weight: bold;
+}"""
 
 
 class AccessibilityManager:
@@ -10,13 +24,20 @@ class AccessibilityManager:
     def __init__(self, window, app=None):
         self._window = window
         self._app = app or window.get_application()
-        self._font_scale = 1.0
+        self._display = Gdk.Display.get_default()
+        self._step = DEFAULT_STEP
+        self._applied_step = DEFAULT_STEP
         self._high_contrast = False
-        self._css = Gtk.CssProvider()
+        self._providers = {}
+        self._zoom_css = None
+        self._apply_source = None
+        self._last_apply = 0.0
+        # The high-contrast rule only matches the window's CSS class, so it
+        # stays installed and toggling just flips the class.
+        hc = Gtk.CssProvider()
+        hc.load_from_string(_HIGH_CONTRAST_CSS)
         Gtk.StyleContext.add_provider_for_display(
-            Gdk.Display.get_default(), self._css,
-            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION + 1
-        )
+            self._display, hc, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION + 1)
         self._setup_actions()
 
     def _setup_actions(self):
@@ -35,27 +56,58 @@ class AccessibilityManager:
                 self._app.add_action(action)
                 self._app.set_accels_for_action(f'app.{name}', accels)
 
+    @property
+    def zoom(self):
+        return ZOOM_STEPS[self._step]
+
+    def _provider(self, step):
+        provider = self._providers.get(step)
+        if provider is None:
+            provider = Gtk.CssProvider()
+            provider.load_from_string(f'window {{ font-size: {ZOOM_STEPS[step]}em; }}')
+            self._providers[step] = provider
+        return provider
+
     def _apply_css(self):
-        css = f'window {{ font-size: {self._font_scale}em; }}'
-        if self._high_contrast:
-            css += """
-            window.high-contrast {
-                border: 2px solid @accent_color;
-                font-weight: bold;
-            }"""
-        self._css.load_from_string(css.encode())
+        """Swap in the provider for the current step (parsed at most once)."""
+        if self._zoom_css is not None:
+            Gtk.StyleContext.remove_provider_for_display(self._display, self._zoom_css)
+            self._zoom_css = None
+        if self._step != DEFAULT_STEP:
+            self._zoom_css = self._provider(self._step)
+            Gtk.StyleContext.add_provider_for_display(
+                self._display, self._zoom_css,
+                Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION + 1)
+        self._applied_step = self._step
+        self._last_apply = time.monotonic()
+        timer_area = getattr(self._window, 'timer_area', None)
+        if timer_area is not None:
+            timer_area.set_zoom(self.zoom)
+
+    def _set_step(self, step):
+        self._step = max(0, min(step, len(ZOOM_STEPS) - 1))
+        if self._apply_source is not None:
+            return  # the pending apply will pick up the latest step
+        wait = APPLY_INTERVAL_MS - (time.monotonic() - self._last_apply) * 1000
+        if wait <= 0:
+            self._apply_css()
+        else:
+            self._apply_source = GLib.timeout_add(int(wait) + 1, self._on_apply_timeout)
+
+    def _on_apply_timeout(self):
+        self._apply_source = None
+        if self._step != self._applied_step:
+            self._apply_css()
+        return GLib.SOURCE_REMOVE
 
     def _zoom_in(self):
-        self._font_scale = min(self._font_scale + 0.1, 3.0)
-        self._apply_css()
+        self._set_step(self._step + 1)
 
     def _zoom_out(self):
-        self._font_scale = max(self._font_scale - 0.1, 0.5)
-        self._apply_css()
+        self._set_step(self._step - 1)
 
     def _zoom_reset(self):
-        self._font_scale = 1.0
-        self._apply_css()
+        self._set_step(DEFAULT_STEP)
 
     def _toggle_hc(self):
         self._high_contrast = not self._high_contrast
@@ -63,4 +115,3 @@ class AccessibilityManager:
             self._window.add_css_class('high-contrast')
         else:
             self._window.remove_css_class('high-contrast')
-        self._apply_css()
@@ -0,0 +1,426 @@
+"""Headless measurements for Tidskollen.
+
+Run with ``python3 -m tidskollen.bench <name>``; see ``--help`` for the list.
+"""
+import argparse
+import math
+import random
+import sys
+import time
+
+from tidskollen.timer import TimerEngine
+
+
+class FakeClock:
+    """Monotonic clock that only moves when told to."""
+
+    def __init__(self, start=1000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def _late(rng, max_late_ms):
+    return rng.uniform(0, max_late_ms) / 1000.0
+
+
+def drift_legacy(duration, max_late_ms, seed=0):
+    """Old behaviour: re-arm a 1000 ms timeout and decrement a counter."""
+    rng = random.Random(seed)
+    clock = FakeClock()
+    started = clock()
+    remaining = duration
+    while remaining > 0:
+        clock.advance(1.0 + _late(rng, max_late_ms))
+        remaining -= 1
+    return clock() - started - duration
+
+
+def drift_engine(duration, max_late_ms, seed=0):
+    """TimerEngine woken at second boundaries by an equally late scheduler."""
+    rng = random.Random(seed)
+    clock = FakeClock()
+    engine = TimerEngine(duration, clock=clock)
+    finished = []
+    engine.subscribe(lambda e, ev: ev == "finish" and finished.append(clock()))
+    started = clock()
+    engine.start()
+    wakeups = 0
+    while not finished:
+        clock.advance(int(engine.until_next_second() * 1000 + 1) / 1000.0
+                      + _late(rng, max_late_ms))
+        engine.poll()
+        wakeups += 1
+    return finished[0] - started - duration, wakeups
+
+
+def bench_drift(args):
+    print(f"{'duration':>9} {'legacy drift':>13} {'engine drift':>13} {'wakeups':>8}")
+    for minutes in args.minutes:
+        duration = minutes * 60
+        legacy = drift_legacy(duration, args.late, args.seed)
+        engine, wakeups = drift_engine(duration, args.late, args.seed)
+        print(f"{minutes:>7}m {legacy:>12.3f}s {engine:>12.3f}s {wakeups:>8}")
+
+
+class FakeLoop:
+    """Minimal stand-in for GLib timeouts driven by a FakeClock."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.wakeups = 0
+        self._sources = {}
+        self._next_id = 1
+
+    def timeout_add(self, ms, callback):
+        source = self._next_id
+        self._next_id += 1
+        self._sources[source] = (self.clock() + ms / 1000.0, callback)
+        return source
+
+    def source_remove(self, source):
+        self._sources.pop(source, None)
+
+    def run(self, seconds):
+        end = self.clock() + seconds
+        while self._sources:
+            source, (due, callback) = min(self._sources.items(), key=lambda i: i[1][0])
+            if due > end:
+                break
+            self.clock.advance(due - self.clock())
+            del self._sources[source]
+            self.wakeups += 1
+            if callback():
+                self._sources[source] = (self.clock() + 1.0, callback)
+        self.clock.advance(end - self.clock())
+
+
+def _wakeups_legacy(visible, running):
+    # Hidden or not, the old code kept both of its timeouts.
+    loop = FakeLoop(FakeClock(1000.3))
+    loop.timeout_add(1000, lambda: True)  # status clock
+    if running:
+        remaining = [30]
+
+        def countdown():
+            remaining[0] -= 1
+            return remaining[0] > 0
+        loop.timeout_add(1000, countdown)
+    loop.run(60)
+    return loop.wakeups
+
+
+def _wakeups_scheduler(visible, running):
+    from tidskollen.scheduler import SecondScheduler
+
+    clock = FakeClock(1000.3)
+    loop = FakeLoop(clock)
+    sched = SecondScheduler(clock=clock, monotonic=clock,
+                            timeout_add=loop.timeout_add,
+                            source_remove=loop.source_remove)
+    engine = TimerEngine(30, clock=clock)  # finishes inside the minute
+    sched.subscribe(lambda: None, active=visible)
+
+    def arm():
+        # As the window does: the engine's own seconds while shown.
+        if not engine.running:
+            timer.set_deadline(None)
+        elif visible:
+            timer.set_deadline(clock() + engine.until_next_second())
+        else:
+            timer.set_deadline(engine.deadline)
+
+    timer = sched.subscribe(lambda: (engine.poll(), arm()), active=False)
+    if running:
+        engine.start()
+        arm()
+    loop.run(60)
+    return sched.wakeups_per_minute()
+
+
+def bench_wakeups(args):
+    print(f"{'window':<8} {'timer':<8} {'legacy/min':>11} {'shared/min':>11}")
+    for visible in (True, False):
+        for running in (False, True):
+            print(f"{'shown' if visible else 'hidden':<8} "
+                  f"{'30 s' if running else 'idle':<8} "
+                  f"{_wakeups_legacy(visible, running):>11} "
+                  f"{_wakeups_scheduler(visible, running):>11}")
+
+
+def _legacy_draw(cr, width, height, fraction, remaining_seconds):
+    """TimerDrawingArea._draw as it was before the layer cache."""
+    center_x = width / 2
+    center_y = height / 2
+    radius = min(width, height) / 2 - 20
+    cr.set_source_rgb(0.15, 0.65, 0.40)
+    cr.arc(center_x, center_y, radius, 0, 2 * math.pi)
+    cr.fill()
+    if fraction > 0.001:
+        r = 0.75 * fraction + 0.15 * (1 - fraction)
+        g = 0.11 * fraction + 0.65 * (1 - fraction)
+        b = 0.18 * fraction + 0.40 * (1 - fraction)
+        cr.set_source_rgb(r, g, b)
+        start_angle = -math.pi / 2
+        end_angle = start_angle + 2 * math.pi * fraction
+        cr.move_to(center_x, center_y)
+        cr.arc(center_x, center_y, radius, start_angle, end_angle)
+        cr.close_path()
+        cr.fill()
+    cr.set_source_rgb(0.5, 0.5, 0.5)
+    cr.set_line_width(3)
+    cr.arc(center_x, center_y, radius, 0, 2 * math.pi)
+    cr.stroke()
+    text = f"{remaining_seconds // 60}:{remaining_seconds % 60:02d}"
+    cr.set_source_rgb(1, 1, 1)
+    cr.select_font_face("Sans", 0, 1)
+    cr.set_font_size(radius * 0.4)
+    extents = cr.text_extents(text)
+    cr.move_to(center_x - extents.width / 2, center_y + extents.height / 2)
+    cr.show_text(text)
+
+
+def _time_frames(draw, frames):
+    total = 3600
+    started = time.perf_counter()
+    for i in range(frames):
+        remaining = total - i % total
+        draw(remaining / total, remaining)
+    return (time.perf_counter() - started) / frames
+
+
+def bench_draw(args):
+    import cairo
+    from tidskollen.dial import DialPainter
+
+    width, height = args.size
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+    screen = cairo.Context(surface)
+    painter = DialPainter()
+
+    def frame(paint):
+        # Like GTK 4: the draw function records into a recording surface,
+        # which is then rasterized onto the window.
+        def draw(fraction, remaining):
+            recording = cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA, None)
+            paint(cairo.Context(recording), fraction, remaining)
+            screen.set_source_surface(recording, 0, 0)
+            screen.paint()
+        return draw
+
+    legacy = _time_frames(frame(lambda cr, f, r: _legacy_draw(cr, width, height, f, r)),
+                          args.frames)
+    cached = _time_frames(frame(lambda cr, f, r: painter.paint(cr, width, height, f, r)),
+                          args.frames)
+    print(f"{width}x{height}, {args.frames} frames")
+    print(f"  uncached: {legacy * 1000:8.3f} ms/frame")
+    print(f"  cached:   {cached * 1000:8.3f} ms/frame")
+
+
+PRESETS = [1, 2, 5, 10, 15, 20, 30, 45, 60]
+
+
+def _synthetic_sessions(count, per_day=12):
+    day = 20000  # days since the epoch
+    for i in range(count):
+        d, n = divmod(i, per_day)
+        date = time.strftime("%Y-%m-%d", time.gmtime((day + d) * 86400))
+        yield {
+            "date": f"{date} {8 + n // 2:02d}:{(n % 2) * 30:02d}",
+            "duration": PRESETS[i % len(PRESETS)],
+            "completed": i % 5 != 0,
+        }
+
+
+def bench_pdf(args):
+    import os
+    import tempfile
+
+    import cairo
+    from tidskollen.report import render_report
+
+    sessions = list(_synthetic_sessions(args.sessions))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "report.pdf")
+        started = time.perf_counter()
+        pages = render_report(cairo, sessions, path, "Timer Sessions", "bench")
+        elapsed = time.perf_counter() - started
+        size = os.path.getsize(path)
+    print(f"{args.sessions} sessions, {pages} pages, {size // 1024} KiB: "
+          f"{elapsed * 1000:.1f} ms")
+
+
+def bench_sessions(args):
+    import os
+    import tempfile
+    import tracemalloc
+
+    from tidskollen.export import completion_per_week
+    from tidskollen.journal import SessionJournal
+    from tidskollen.sessionbin import BinarySessionStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = SessionJournal(os.path.join(tmp, "sessions.jsonl"))
+        binary = BinarySessionStore(os.path.join(tmp, "sessions.bin"))
+        records = list(_synthetic_sessions(args.sessions))
+        for record in records:
+            journal.append(record)
+        binary.extend(records)
+        del records
+        print(f"{args.sessions} sessions on disk: "
+              f"jsonl {os.path.getsize(journal.path) // 1024} KiB, "
+              f"binary {os.path.getsize(binary.path) // 1024} KiB")
+
+        for label, load in (("jsonl", lambda: list(journal)),
+                            ("binary", lambda: binary)):
+            tracemalloc.start()
+            started = time.perf_counter()
+            sessions = load()
+            weeks = completion_per_week(sessions)
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"  {label:6s} load + weekly completion: {elapsed * 1000:8.1f} ms, "
+                  f"peak {peak // 1024} KiB, {len(weeks)} weeks")
+            del sessions
+
+
+_STARTUP_PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import tidskollen.main
+t1 = time.perf_counter()
+from gi.repository import Gio
+
+def on_window(app, win):
+    def on_realize(w):
+        def on_paint(clock):
+            t2 = time.perf_counter()
+            print(f"{t1 - t0:.6f} {t2 - t0:.6f}", flush=True)
+            app.quit()
+        w.get_frame_clock().connect("after-paint", on_paint)
+    win.connect("realize", on_realize)
+
+app = tidskollen.main.TidskollenApp()
+app.set_flags(app.get_flags() | Gio.ApplicationFlags.NON_UNIQUE)
+app.connect("window-added", on_window)
+app.run(["tidskollen"])
+"""
+
+
+def bench_startup(args):
+    import json
+    import os
+    import statistics
+    import subprocess
+    import tempfile
+
+    imports, frames, totals = [], [], []
+    with tempfile.TemporaryDirectory() as config:
+        os.makedirs(os.path.join(config, "tidskollen"))
+        with open(os.path.join(config, "tidskollen", "settings.json"), "w") as f:
+            json.dump({"welcome_shown": True}, f)
+        env = dict(os.environ, XDG_CONFIG_HOME=config)
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            out = subprocess.run([sys.executable, "-c", _STARTUP_PROBE], env=env,
+                                 capture_output=True, text=True, check=True).stdout
+            totals.append(time.perf_counter() - started)
+            imported, painted = map(float, out.split()[-2:])
+            imports.append(imported)
+            frames.append(painted)
+    print(f"median of {args.runs} runs")
+    print(f"  import tidskollen.main:    {statistics.median(imports) * 1000:7.1f} ms")
+    print(f"  import to first frame:     {statistics.median(frames) * 1000:7.1f} ms")
+    print(f"  whole process incl. exit:  {statistics.median(totals) * 1000:7.1f} ms")
+
+
+def bench_broadcast(args):
+    import asyncio
+    from tidskollen.broadcast import BroadcastFollower, BroadcastServer, timer_state
+
+    async def run():
+        server = BroadcastServer("127.0.0.1", 0)
+        port = await server.start()
+        received = [0]
+        done = asyncio.Event()
+        total = args.followers * args.events
+
+        def on_state(state):
+            received[0] += 1
+            if received[0] == total:
+                done.set()
+
+        followers = [BroadcastFollower("127.0.0.1", port, on_state, retry=0.05)
+                     for _ in range(args.followers)]
+        for follower in followers:
+            follower.start()
+        while len(server) < args.followers:
+            await asyncio.sleep(0.01)
+
+        engine = TimerEngine(300)
+        started = time.perf_counter()
+        for i in range(args.events):
+            server.publish(timer_state(engine, "seek"))
+            await asyncio.sleep(0)
+        await asyncio.wait_for(done.wait(), 30)
+        elapsed = time.perf_counter() - started
+        for follower in followers:
+            follower.stop()
+        await server.close()
+        return elapsed
+
+    elapsed = asyncio.run(run())
+    print(f"{args.followers} followers, {args.events} events on localhost: "
+          f"{elapsed * 1000:.1f} ms to deliver all "
+          f"({elapsed * 1000 / args.events:.2f} ms per event)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="tidskollen.bench")
+    sub = parser.add_subparsers(dest="name", required=True)
+
+    p = sub.add_parser("drift", help="countdown drift under late wakeups (fake clock)")
+    p.add_argument("--minutes", type=int, nargs="+", default=[5, 45, 240])
+    p.add_argument("--late", type=float, default=40.0,
+                   help="maximum wakeup lateness in ms")
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=bench_drift)
+
+    p = sub.add_parser("draw", help="dial paint cost per frame, recorded and replayed as in GTK 4")
+    p.add_argument("--size", type=int, nargs=2, default=[1920, 1080],
+                   metavar=("WIDTH", "HEIGHT"))
+    p.add_argument("--frames", type=int, default=300)
+    p.set_defaults(func=bench_draw)
+
+    p = sub.add_parser("pdf", help="time to render the PDF session report")
+    p.add_argument("--sessions", type=int, default=10000)
+    p.set_defaults(func=bench_pdf)
+
+    p = sub.add_parser("sessions", help="JSONL vs binary session store size and scan time")
+    p.add_argument("--sessions", type=int, default=200000)
+    p.set_defaults(func=bench_sessions)
+
+    p = sub.add_parser("startup", help="import time and time to first frame")
+    p.add_argument("--runs", type=int, default=5)
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("wakeups", help="main-loop wakeups per minute (fake clock)")
+    p.set_defaults(func=bench_wakeups)
+
+    p = sub.add_parser("broadcast", help="fan-out time to many localhost followers")
+    p.add_argument("--followers", type=int, default=300)
+    p.add_argument("--events", type=int, default=50)
+    p.set_defaults(func=bench_broadcast)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""Share one timer with many displays on the local network.
+
+The leader runs a small asyncio TCP server and pushes one JSON line per
+state change (start, pause, reset, seek, finish) to every connected
+follower. Followers re-base the remaining time on their own clock when a
+message arrives, so no clock synchronisation is needed. Nothing is polled:
+each change is encoded once and written to all client buffers, and a
+client whose buffer backs up is dropped instead of slowing the others.
+"""
+import asyncio
+import json
+import threading
+
+DEFAULT_PORT = 47474
+MAX_CLIENT_BUFFER = 64 * 1024
+BACKLOG = 1024  # a whole school's displays may reconnect at once
+
+
+def timer_state(engine, event, schedule=None):
+    """Describe an engine as a broadcast message."""
+    return {
+        "event": event,
+        "duration": engine.duration,
+        "remaining": engine.remaining,
+        "running": engine.running,
+        "schedule": schedule,
+    }
+
+
+def apply_state(engine, state):
+    """Make a follower's engine match a received message."""
+    if engine.duration != state["duration"]:
+        engine.reset(state["duration"])
+    if state.get("event") == "finish" or (state["running"] and state["remaining"] <= 0):
+        # Finish through the engine so the follower emits "finish" exactly
+        # once, whether its own deadline or this message arrives first.
+        if engine.running:
+            engine.seek(0)
+            engine.poll()
+        elif engine.remaining > 0:
+            engine.seek(0)  # joined after the end: show it, but quietly
+        return
+    engine.seek(state["remaining"])
+    if state["running"]:
+        engine.start()
+    else:
+        engine.pause()
+
+
+class LoopThread:
+    """An asyncio event loop running on a daemon thread."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def submit(self, coro):
+        """Run a coroutine on the loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, fn, *args):
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+class BroadcastServer:
+    def __init__(self, host="0.0.0.0", port=DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self._server = None
+        self._clients = set()
+        self._handlers = set()
+        self._last = None
+
+    def __len__(self):
+        return len(self._clients)
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._on_client, self.host, self.port, backlog=BACKLOG)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+        for writer in list(self._clients):
+            writer.close()
+        self._clients.clear()
+        # Closing a writer ends its handler with EOF; let them finish.
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    async def _on_client(self, reader, writer):
+        self._handlers.add(asyncio.current_task())
+        self._clients.add(writer)
+        if self._last is not None:
+            writer.write(self._last)
+        try:
+            while await reader.read(1024):
+                pass  # followers have nothing to say; wait for EOF
+        except OSError:
+            pass
+        finally:
+            self._clients.discard(writer)
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    def publish(self, state):
+        """Fan a message out to every follower. Must run on the loop thread."""
+        data = (json.dumps(state, separators=(",", ":")) + "\n").encode()
+        self._last = data
+        for writer in list(self._clients):
+            if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                self._clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(data)
+
+
+class BroadcastFollower:
+    """Receives messages from a leader, reconnecting when it goes away.
+
+    on_connection(connected, error), if given, is called when the link
+    comes up or goes down, not on every failed retry; error is the
+    exception that broke or refused it, or None.
+    """
+
+    def __init__(self, host, port=DEFAULT_PORT, on_state=None, retry=2.0,
+                 on_connection=None):
+        self.host = host
+        self.port = port
+        self._on_state = on_state
+        self._on_connection = on_connection
+        self._retry = retry
+        self._task = None
+        self._connected = None
+
+    def start(self):
+        """Start following. Must run on the loop thread."""
+        self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _set_connected(self, connected, error=None):
+        if connected != self._connected:
+            self._connected = connected
+            if self._on_connection:
+                self._on_connection(connected, error)
+
+    async def _run(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as e:
+                self._set_connected(False, e)
+                await asyncio.sleep(self._retry)
+                continue
+            self._set_connected(True)
+            error = None
+            try:
+                while True:
+                    # ValueError: a line longer than the stream limit.
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    try:
+                        state = json.loads(line)
+                    except ValueError:
+                        continue
+                    if self._on_state:
+                        self._on_state(state)
+            except (OSError, ValueError) as e:
+                error = e
+            finally:
+                writer.close()
+            self._set_connected(False, error)
+            await asyncio.sleep(self._retry)
+
+
+def parse_address(text, default_port=DEFAULT_PORT):
+    """Split "host[:port]" or "[ipv6]:port" into (host, port).
+
+    Anything else with more than one colon is taken as a bare IPv6 host.
+    """
+    text = text.strip()
+    if text.startswith("["):
+        host, _sep, rest = text[1:].partition("]")
+        port = rest[1:] if rest.startswith(":") else ""
+        return host, int(port) if port.isdigit() else default_port
+    if text.count(":") > 1:
+        return text, default_port
+    host, sep, port = text.rpartition(":")
+    if not sep or not port.isdigit():
+        return text, default_port
+    return host, int(port)
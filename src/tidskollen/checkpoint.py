@@ -0,0 +1,100 @@
+"""Crash-safe checkpoint of the running timer.
+
+The state is one fixed-size binary record (see RECORD) written with
+temp-file-and-rename, and only when it actually changes on a state
+transition, never per tick. Writing happens on the background writer so
+the main loop never waits for the disk.
+"""
+import os
+import struct
+import time
+import zlib
+
+from tidskollen import writer
+
+MAGIC = b"TKCP"
+VERSION = 2
+IDLE, RUNNING, PAUSED = 0, 1, 2
+FLAG_SCHEDULE = 1
+
+# magic, version, state, flags, duration, wall deadline or remaining,
+# schedule segment index, profile name (first 32 bytes), crc32 of the whole
+# profile name, crc32 of everything before it
+RECORD = struct.Struct("<4sHBBddi32sII")
+PROFILE_BYTES = 32
+
+
+class TimerCheckpoint:
+    __slots__ = ("state", "duration", "value", "segment", "profile", "schedule")
+
+    def __init__(self, state=IDLE, duration=0.0, value=0.0, segment=-1,
+                 profile="default", schedule=False):
+        self.state = state
+        self.duration = duration
+        self.value = value  # wall-clock deadline if RUNNING, else remaining
+        self.segment = segment
+        self.profile = profile  # None if the stored name was cut short
+        self.schedule = schedule
+
+    @classmethod
+    def capture(cls, engine, segment=-1, profile="default", schedule=False):
+        if engine.running:
+            state, value = RUNNING, time.time() + engine.remaining
+        else:
+            state = PAUSED if engine.remaining < engine.duration else IDLE
+            value = engine.remaining
+        return cls(state, engine.duration, value, segment, profile, schedule)
+
+    def remaining(self):
+        """Seconds left now; a running timer keeps counting while we were down."""
+        if self.state == RUNNING:
+            return max(0.0, self.value - time.time())
+        return self.value
+
+    def pack(self):
+        name = self.profile.encode("utf-8")
+        body = RECORD.pack(MAGIC, VERSION, self.state,
+                           FLAG_SCHEDULE if self.schedule else 0,
+                           self.duration, self.value, self.segment,
+                           name[:PROFILE_BYTES], zlib.crc32(name), 0)[:-4]
+        return body + struct.pack("<I", zlib.crc32(body))
+
+    @classmethod
+    def unpack(cls, data):
+        if len(data) != RECORD.size:
+            return None
+        (magic, version, state, flags, duration, value, segment,
+         profile, profile_crc, crc) = RECORD.unpack(data)
+        if magic != MAGIC or version != VERSION or crc != zlib.crc32(data[:-4]):
+            return None
+        profile = profile.rstrip(b"\0")
+        if zlib.crc32(profile) != profile_crc:
+            name = None  # longer than PROFILE_BYTES; we only have a prefix
+        else:
+            name = profile.decode("utf-8", "replace")
+        return cls(state, duration, value, segment, name,
+                   bool(flags & FLAG_SCHEDULE))
+
+
+class CheckpointFile:
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._last = None
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read(RECORD.size + 1)
+        except OSError:
+            return None
+        self._last = data
+        return TimerCheckpoint.unpack(data)
+
+    def save(self, checkpoint):
+        """Queue an atomic write; skipped when the record is unchanged."""
+        data = checkpoint.pack()
+        if data == self._last:
+            return False
+        writer.get_default().write(self.path, data)
+        self._last = data
+        return True
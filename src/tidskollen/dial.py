@@ -0,0 +1,178 @@
+"""Cairo painter for the countdown dial.
+
+The filled circle and its border never change while the timer runs, so they
+are rendered once per size, scale and theme into image surfaces and only
+the wedge and the digits are painted on every frame. The digits go through a
+reused Pango layout with tabular figures, so they do not jitter as they
+change.
+"""
+import math
+
+import cairo
+import gi
+gi.require_version('Pango', '1.0')
+gi.require_version('PangoCairo', '1.0')
+from gi.repository import Pango, PangoCairo
+
+BACKGROUND = (0.15, 0.65, 0.40)  # green = done
+WEDGE_FULL = (0.75, 0.11, 0.18)  # red = remaining
+BORDER = (0.5, 0.5, 0.5)
+BORDER_WIDTH = 3
+TEXT_SIZE = 0.4      # digit height relative to the dial radius
+MAX_TEXT_SIZE = 0.6  # still fits "60:00" inside the dial when zoomed
+
+
+def dial_geometry(width, height):
+    """Return (center_x, center_y, radius) for a widget of the given size."""
+    return width / 2, height / 2, min(width, height) / 2 - 20
+
+
+def smooth_frame_rate(radius, duration, max_fps=60, step_px=0.5):
+    """Lowest frame rate at which the wedge edge moves at most step_px per frame."""
+    if duration <= 0 or radius <= 0:
+        return 0
+    speed = 2 * math.pi * radius / duration  # px/s along the rim
+    return max(1, min(max_fps, math.ceil(speed / step_px)))
+
+
+def format_time(seconds):
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+class CountdownText:
+    """One Pango layout for the digits, measured once per font size.
+
+    Digit and colon advances are looked up when the size changes, so the
+    text is centred by adding up widths instead of re-measuring the layout
+    every frame. The layout is only re-shaped when the string changes.
+    """
+
+    FONT = "Sans Bold"
+    CHARS = "0123456789:"
+
+    def __init__(self):
+        self._layout = None
+        self._size = None
+        self._text = None
+        self._widths = {}
+        self._ink_mid = 0
+
+    def _ensure_layout(self, cr, size):
+        if self._layout is None:
+            self._layout = PangoCairo.create_layout(cr)
+            attrs = Pango.AttrList()
+            attrs.insert(Pango.attr_font_features_new("tnum=1"))
+            self._layout.set_attributes(attrs)
+        else:
+            PangoCairo.update_layout(cr, self._layout)
+        if size == self._size:
+            return
+        desc = Pango.FontDescription.from_string(self.FONT)
+        desc.set_absolute_size(size * Pango.SCALE)
+        self._layout.set_font_description(desc)
+        self._widths = {}
+        for ch in self.CHARS:
+            self._layout.set_text(ch, -1)
+            _ink, logical = self._layout.get_pixel_extents()
+            self._widths[ch] = logical.width
+        self._layout.set_text("0", -1)
+        ink, _logical = self._layout.get_pixel_extents()
+        self._ink_mid = ink.y + ink.height / 2
+        self._size = size
+        self._text = None
+
+    def paint(self, cr, cx, cy, size, text):
+        """Draw text centred on (cx, cy) at a pixel size."""
+        self._ensure_layout(cr, round(size))
+        if text != self._text:
+            self._layout.set_text(text, -1)
+            self._text = text
+        width = sum(self._widths.get(ch, 0) for ch in text)
+        cr.move_to(cx - width / 2, cy - self._ink_mid)
+        PangoCairo.show_layout(cr, self._layout)
+
+
+class DialPainter:
+    """Paints the dial, caching the static layers between frames."""
+
+    def __init__(self):
+        self._theme = None
+        self._key = None
+        self._base = None
+        self._ring = None
+        self._text = CountdownText()
+        self.text_scale = 1.0
+
+    def set_theme(self, theme):
+        """Set an opaque theme key; changing it drops the cached layers."""
+        if theme != self._theme:
+            self._theme = theme
+            self.invalidate()
+
+    def invalidate(self):
+        self._key = None
+        self._base = None
+        self._ring = None
+
+    @staticmethod
+    def _layer(width, height, scale):
+        # In GTK 4 the draw function paints into a recording surface, so
+        # create_similar() would only record the commands again; the layers
+        # must be real pixels at the widget's scale to be worth caching.
+        surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, math.ceil(width * scale),
+                                     math.ceil(height * scale))
+        surface.set_device_scale(scale, scale)
+        return surface
+
+    def _ensure_layers(self, width, height, scale):
+        key = (width, height, scale, self._theme)
+        if key == self._key:
+            return
+        cx, cy, radius = dial_geometry(width, height)
+
+        self._base = self._layer(width, height, scale)
+        lc = cairo.Context(self._base)
+        lc.set_source_rgb(*BACKGROUND)
+        lc.arc(cx, cy, radius, 0, 2 * math.pi)
+        lc.fill()
+
+        # The border goes on top of the wedge, so it gets its own layer.
+        self._ring = self._layer(width, height, scale)
+        lc = cairo.Context(self._ring)
+        lc.set_source_rgb(*BORDER)
+        lc.set_line_width(BORDER_WIDTH)
+        lc.arc(cx, cy, radius, 0, 2 * math.pi)
+        lc.stroke()
+
+        self._key = key
+
+    def paint(self, cr, width, height, fraction, remaining_seconds, scale=1):
+        """Paint the dial; scale is the widget's scale factor."""
+        cx, cy, radius = dial_geometry(width, height)
+        if radius < 10:
+            return
+        self._ensure_layers(width, height, scale)
+
+        cr.set_source_surface(self._base, 0, 0)
+        cr.paint()
+
+        # Remaining time wedge, interpolated red→green
+        if fraction > 0.001:
+            cr.set_source_rgb(*(f * fraction + b * (1 - fraction)
+                                for f, b in zip(WEDGE_FULL, BACKGROUND)))
+            start_angle = -math.pi / 2
+            end_angle = start_angle + 2 * math.pi * fraction
+            cr.move_to(cx, cy)
+            cr.arc(cx, cy, radius, start_angle, end_angle)
+            cr.close_path()
+            cr.fill()
+
+        cr.set_source_surface(self._ring, 0, 0)
+        cr.paint()
+
+        self._paint_text(cr, cx, cy, radius, format_time(remaining_seconds))
+
+    def _paint_text(self, cr, cx, cy, radius, text):
+        cr.set_source_rgb(1, 1, 1)
+        size = radius * min(TEXT_SIZE * self.text_scale, MAX_TEXT_SIZE)
+        self._text.paint(cr, cx, cy, size, text)
@@ -3,7 +3,10 @@
 import csv
 import io
 import json
-from datetime import datetime
+import os
+import threading
+import time
+from datetime import datetime, timedelta
 
 import gettext
 _ = gettext.gettext
@@ -20,35 +23,137 @@ gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, Gio, GLib
 
 
-def sessions_to_csv(sessions):
-    """Export timer sessions as CSV string."""
+CHUNK_ROWS = 500
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+RECENT_DAYS = 30
+
+
+def iter_csv(sessions, source=None):
+    """Yield the CSV export in chunks, consuming sessions lazily.
+
+    source is accepted like iter_json's; CSV has no summary to take from it.
+    """
     output = io.StringIO()
     writer = csv.writer(output)
     writer.writerow([_("Date"), _("Duration (min)"), _("Completed")])
-    for s in sessions:
+    for i, s in enumerate(sessions, 1):
         writer.writerow([
             s.get("date", ""),
             s.get("duration", 0),
             _("Yes") if s.get("completed") else _("No"),
         ])
+        if i % CHUNK_ROWS == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
     writer.writerow([])
     writer.writerow([f"{APP_LABEL} v{__version__} — {WEBSITE}"])
-    return output.getvalue()
+    yield output.getvalue()
 
 
-def sessions_to_json(sessions):
-    """Export timer sessions as JSON string."""
-    data = {
-        "sessions": sessions,
+def sessions_to_csv(sessions):
+    """Export timer sessions as CSV string."""
+    return "".join(iter_csv(sessions))
+
+
+class _WeekTally:
+    """Running per-week session and completion counts."""
+
+    def __init__(self):
+        self._weeks = {}
+
+    def add(self, s):
+        try:
+            week = datetime.strptime(s.get("date", ""), DATE_FORMAT).strftime("%G-%V")
+        except ValueError:
+            return
+        count, done = self._weeks.get(week, (0, 0))
+        self._weeks[week] = (count + 1, done + bool(s.get("completed")))
+
+    def rows(self):
+        return [(week, count, done, done / count)
+                for week, (count, done) in sorted(self._weeks.items())]
+
+
+def sessions_between(sessions, start, end):
+    """Sessions that started in [start, end) (datetimes).
+
+    A store with a between() query (SQLite, binary) answers from its index
+    on start time; anything else is filtered while it streams past.
+    """
+    if hasattr(sessions, "between"):
+        return sessions.between(start, end)
+    first, last = start.strftime(DATE_FORMAT), end.strftime(DATE_FORMAT)
+    return (s for s in sessions if first <= (s.get("date") or "") < last)
+
+
+def completion_per_week(sessions):
+    """Return [(week, sessions, completed, rate)] with week as ISO "%G-%V".
+
+    Uses the store's own aggregate query when it has one (SQLite backend)
+    instead of pulling every row into Python.
+    """
+    if hasattr(sessions, "completion_by_week"):
+        return list(sessions.completion_by_week())
+    tally = _WeekTally()
+    for s in sessions:
+        tally.add(s)
+    return tally.rows()
+
+
+def _dumps(value, depth):
+    text = json.dumps(value, indent=2, ensure_ascii=False)
+    return text.replace("\n", "\n" + "  " * depth)
+
+
+def iter_json(sessions, source=None):
+    """Yield the JSON export in chunks, consuming sessions only once.
+
+    The output is identical to json.dumps(..., indent=2) of the whole
+    document, but only one session is serialised at a time. source is the
+    store sessions come from, when sessions is a wrapper around it (such
+    as an export job's progress iterator); its completion_by_week() query
+    then provides the weekly summary.
+    """
+    if source is None:
+        source = sessions
+    tally = None if hasattr(source, "completion_by_week") else _WeekTally()
+    yield '{\n  "sessions": ['
+    sep = "\n    "
+    for s in sessions:
+        if tally is not None:
+            tally.add(s)
+        yield sep + _dumps(s if isinstance(s, dict) else dict(s), 2)
+        sep = ",\n    "
+    yield "]" if sep == "\n    " else "\n  ]"
+    weeks = tally.rows() if tally is not None else completion_per_week(source)
+    tail = {
+        "weeks": [{"week": week, "sessions": count, "completed": done,
+                   "completion_rate": round(rate, 3)}
+                  for week, count, done, rate in weeks],
         "_exported_by": f"{APP_LABEL} v{__version__}",
         "_author": AUTHOR,
         "_website": WEBSITE,
     }
-    return json.dumps(data, indent=2, ensure_ascii=False)
+    for key, value in tail.items():
+        yield f",\n  {json.dumps(key)}: {_dumps(value, 1)}"
+    yield "\n}"
+
+
+def sessions_to_json(sessions):
+    """Export timer sessions as JSON string."""
+    return "".join(iter_json(sessions))
+
+
+def write_chunks(path, chunks):
+    """Write an iterable of text chunks straight to path."""
+    with open(path, "w") as f:
+        for chunk in chunks:
+            f.write(chunk)
 
 
 def export_sessions_pdf(sessions, output_path):
-    """Export timer sessions as PDF."""
+    """Export timer sessions as PDF, grouped per day with summary rows."""
     try:
         import cairo
     except ImportError:
@@ -56,68 +161,35 @@ def export_sessions_pdf(sessions, output_path):
             import cairocffi as cairo
         except ImportError:
             return False
+    from tidskollen.report import render_report
 
-    width, height = 595, 842
-    surface = cairo.PDFSurface(output_path, width, height)
-    ctx = cairo.Context(surface)
-
-    ctx.set_font_size(24)
-    ctx.move_to(40, 50)
-    ctx.show_text(_("Timer Sessions"))
-
-    ctx.set_font_size(12)
-    ctx.move_to(40, 75)
-    ctx.show_text(datetime.now().strftime("%Y-%m-%d"))
-
-    # Table header
-    y = 110
-    ctx.set_font_size(14)
-    ctx.set_source_rgb(0.3, 0.3, 0.3)
-    ctx.move_to(40, y)
-    ctx.show_text(_("Date"))
-    ctx.move_to(200, y)
-    ctx.show_text(_("Duration (min)"))
-    ctx.move_to(380, y)
-    ctx.show_text(_("Completed"))
-
-    y += 10
-    ctx.set_line_width(0.5)
-    ctx.move_to(40, y)
-    ctx.line_to(width - 40, y)
-    ctx.stroke()
-
-    ctx.set_source_rgb(0, 0, 0)
-    ctx.set_font_size(12)
-
-    for s in sessions:
-        y += 24
-        if y > height - 40:
-            surface.show_page()
-            y = 40
-        ctx.move_to(40, y)
-        ctx.show_text(s.get("date", ""))
-        ctx.move_to(200, y)
-        ctx.show_text(str(s.get("duration", 0)))
-        ctx.move_to(380, y)
-        ctx.show_text("✓" if s.get("completed") else "✗")
-
-    # Footer
-    ctx.set_font_size(9)
-    ctx.set_source_rgb(0.5, 0.5, 0.5)
     footer = f"{APP_LABEL} v{__version__} — {WEBSITE} — {datetime.now().strftime('%Y-%m-%d')}"
-    ctx.move_to(40, height - 20)
-    ctx.show_text(footer)
-
-    surface.finish()
+    render_report(cairo, sessions, output_path, _("Timer Sessions"), footer)
     return True
 
 
+def stats_summary(stats, now=None):
+    """A few lines describing the history, read from running totals."""
+    now = now or datetime.now()
+    lines = [
+        _("%(count)d sessions, %(rate)d%% completed") % {
+            "count": stats.count, "rate": round(stats.completion_rate * 100)},
+        _("%(today)d min today, %(week)d min this week") % {
+            "today": stats.minutes_on(now), "week": stats.minutes_in_week(now)},
+    ]
+    top = stats.top_durations()
+    if top:
+        lines.append(_("Most used: %s") % ", ".join(_("%d min") % m for m in top))
+    return "\n".join(lines)
+
+
 def show_export_dialog(window, sessions, status_callback=None):
     """Show export dialog with CSV/JSON/PDF options."""
-    dialog = Adw.AlertDialog.new(
-        _("Export Timer Sessions"),
-        _("Choose export format:")
-    )
+    body = _("Choose export format:")
+    stats = getattr(window, "session_stats", None)
+    if stats is not None and len(stats):
+        body = stats_summary(stats) + "\n\n" + body
+    dialog = Adw.AlertDialog.new(_("Export Timer Sessions"), body)
 
     dialog.add_response("cancel", _("Cancel"))
     dialog.add_response("csv", _("CSV"))
@@ -126,61 +198,163 @@ def show_export_dialog(window, sessions, status_callback=None):
     dialog.set_default_response("csv")
     dialog.set_close_response("cancel")
 
-    dialog.connect("response", _on_export_response, window, sessions, status_callback)
+    options = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+    recent = Gtk.CheckButton(label=_("Only the last %d days") % RECENT_DAYS)
+    options.append(recent)
+    # With several profiles, offer a report streamed over all of them.
+    every_profile = None
+    partitions = getattr(window, "session_partitions", None)
+    if partitions is not None and len(partitions.profiles()) > 1:
+        every_profile = Gtk.CheckButton(label=_("Include all profiles"))
+        options.append(every_profile)
+    dialog.set_extra_child(options)
+
+    dialog.connect("response", _on_export_response, window, sessions,
+                   status_callback, every_profile, recent)
     dialog.present(window)
 
 
-def _on_export_response(dialog, response, window, sessions, status_callback):
+def _on_export_response(dialog, response, window, sessions, status_callback,
+                        every_profile=None, recent=None):
     if response == "cancel":
         return
+    if every_profile is not None and every_profile.get_active():
+        sessions = window.session_partitions.iter_all()
+    if recent is not None and recent.get_active():
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        sessions = sessions_between(sessions, today - timedelta(days=RECENT_DAYS - 1),
+                                    today + timedelta(days=1))
     if response == "csv":
-        _save_text(window, sessions, "csv", sessions_to_csv, status_callback)
+        _save_text(window, sessions, "csv", iter_csv, status_callback)
     elif response == "json":
-        _save_text(window, sessions, "json", sessions_to_json, status_callback)
+        _save_text(window, sessions, "json", iter_json, status_callback)
     elif response == "pdf":
         _save_pdf(window, sessions, status_callback)
 
 
+class ExportCancelled(Exception):
+    """Raised inside an export worker when the user cancels."""
+
+
+class ExportJob:
+    """Run one export on a worker thread.
+
+    ``write(path, rows, source)`` does the conversion and returns the
+    status message; rows iterates the sessions while reporting progress,
+    and source is the sessions object itself, for its aggregate queries.
+    If the window has a ``toast_overlay``, progress is shown in a
+    toast with a Cancel button and the final message in a second toast;
+    otherwise both go to ``status_callback``. Either way they are delivered
+    on the main loop through GLib.idle_add.
+    """
+
+    PROGRESS_INTERVAL = 0.25
+
+    def __init__(self, window, sessions, path, write, status_callback=None):
+        self._window = window
+        self._sessions = sessions
+        self._path = path
+        self._write = write
+        self._status_callback = status_callback
+        self._cancel = threading.Event()
+        self._total = len(sessions) if hasattr(sessions, "__len__") else None
+        self._toast = None
+
+    def start(self):
+        overlay = getattr(self._window, "toast_overlay", None)
+        if overlay is not None:
+            self._toast = Adw.Toast.new(_("Exporting…"))
+            self._toast.set_timeout(0)
+            self._toast.set_button_label(_("Cancel"))
+            self._toast.connect("button-clicked", lambda *_: self.cancel())
+            overlay.add_toast(self._toast)
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _rows(self):
+        last = 0.0
+        for i, s in enumerate(self._sessions, 1):
+            if self._cancel.is_set():
+                raise ExportCancelled()
+            if i % CHUNK_ROWS == 0:
+                now = time.monotonic()
+                if now - last >= self.PROGRESS_INTERVAL:
+                    last = now
+                    GLib.idle_add(self._report, i)
+            yield s
+
+    def _run(self):
+        try:
+            message = self._write(self._path, self._rows(), self._sessions)
+        except ExportCancelled:
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+            message = _("Export cancelled")
+        except Exception as e:
+            message = _("Export error: %s") % str(e)
+        GLib.idle_add(self._finish, message)
+
+    def _report(self, done):
+        if self._total:
+            message = _("Exporting… %d%%") % (100 * done // self._total)
+        else:
+            message = _("Exporting… %d sessions") % done
+        if self._toast is not None:
+            self._toast.set_title(message)
+        elif self._status_callback:
+            self._status_callback(message)
+        return GLib.SOURCE_REMOVE
+
+    def _finish(self, message):
+        if self._toast is not None:
+            self._toast.dismiss()
+            self._window.toast_overlay.add_toast(Adw.Toast.new(message))
+        elif self._status_callback:
+            self._status_callback(message)
+        return GLib.SOURCE_REMOVE
+
+
 def _save_text(window, sessions, ext, converter, status_callback):
     dialog = Gtk.FileDialog.new()
     dialog.set_title(_("Save Export"))
     dialog.set_initial_name(f"tidskollen_{datetime.now().strftime('%Y-%m-%d')}.{ext}")
-    dialog.save(window, None, _on_text_done, sessions, converter, ext, status_callback)
+    dialog.save(window, None, _on_text_done, window, sessions, converter, ext,
+                status_callback)
 
 
-def _on_text_done(dialog, result, sessions, converter, ext, status_callback):
+def _on_text_done(dialog, result, window, sessions, converter, ext, status_callback):
     try:
         gfile = dialog.save_finish(result)
     except GLib.Error:
         return
-    try:
-        with open(gfile.get_path(), "w") as f:
-            f.write(converter(sessions))
-        if status_callback:
-            status_callback(_("Exported %s") % ext.upper())
-    except Exception as e:
-        if status_callback:
-            status_callback(_("Export error: %s") % str(e))
+
+    def write(path, rows, source):
+        write_chunks(path, converter(rows, source))
+        return _("Exported %s") % ext.upper()
+
+    ExportJob(window, sessions, gfile.get_path(), write, status_callback).start()
 
 
 def _save_pdf(window, sessions, status_callback):
     dialog = Gtk.FileDialog.new()
     dialog.set_title(_("Save PDF"))
     dialog.set_initial_name(f"tidskollen_{datetime.now().strftime('%Y-%m-%d')}.pdf")
-    dialog.save(window, None, _on_pdf_done, sessions, status_callback)
+    dialog.save(window, None, _on_pdf_done, window, sessions, status_callback)
 
 
-def _on_pdf_done(dialog, result, sessions, status_callback):
+def _on_pdf_done(dialog, result, window, sessions, status_callback):
     try:
         gfile = dialog.save_finish(result)
     except GLib.Error:
         return
-    try:
-        success = export_sessions_pdf(sessions, gfile.get_path())
-        if success and status_callback:
-            status_callback(_("PDF exported"))
-        elif not success and status_callback:
-            status_callback(_("PDF export requires cairo."))
-    except Exception as e:
-        if status_callback:
-            status_callback(_("Export error: %s") % str(e))
+
+    def write(path, rows, source):
+        if export_sessions_pdf(rows, path):
+            return _("PDF exported")
+        return _("PDF export requires cairo.")
+
+    ExportJob(window, sessions, gfile.get_path(), write, status_callback).start()
@@ -0,0 +1,157 @@
+"""Append-only session journal (one JSON object per line)."""
+import contextlib
+import fcntl
+import json
+import os
+import threading
+
+
+def _encode(record):
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+            + "\n").encode("utf-8")
+
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Hold an exclusive advisory lock on path + ".lock".
+
+    Other app instances take the same lock before changing the file.
+    lockf() is used because, unlike flock(), it also works on NFS.
+    """
+    fd = os.open(os.fspath(path) + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.lockf(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # also releases the lock
+
+
+def iter_jsonl(path):
+    """Yield records from a JSONL file, skipping torn or corrupt lines."""
+    try:
+        f = open(path, encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            if not line.endswith("\n"):
+                break  # torn final write
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class SessionJournal:
+    """Session history stored as an append-only JSONL file.
+
+    Each record is written with a single O_APPEND write, so a crash can at
+    worst leave one torn final line, which readers skip. The history is
+    only rewritten by a one-off migrate(); a rewrite replaces the file and
+    makes every instance re-read all of it.
+
+    Several app instances may share one journal. Appends and migrate()
+    hold file_lock(), and each instance follows the others' appends with
+    read_since(), which only reads the new tail.
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._checked_tail = False
+
+    def __iter__(self):
+        return iter_jsonl(self.path)
+
+    def append(self, record):
+        data = _encode(record)
+        with self._lock, file_lock(self.path):
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if not self._checked_tail:
+                    # Terminate a torn line so it cannot swallow this record.
+                    self._checked_tail = True
+                    if os.fstat(fd).st_size and not self._ends_with_newline():
+                        data = b"\n" + data
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+
+    def position(self):
+        """Where the next read_since() should continue: (inode, offset)."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return (None, 0)
+        return (st.st_ino, st.st_size)
+
+    def read_since(self, position):
+        """Records appended after position, by any instance.
+
+        Returns (records, new position, reset). If the file was replaced
+        since position (a migration, here or elsewhere), or position is
+        None, everything is read and reset is True.
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return [], (None, 0), position is not None
+        with f:
+            inode = os.fstat(f.fileno()).st_ino
+            reset = position is None or position[0] != inode
+            offset = 0 if reset else position[1]
+            f.seek(offset)
+            # Line by line, so a long history is never read in one piece.
+            records = []
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn, or still being written
+                offset += len(line)
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records, (inode, offset), reset
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def migrate(self, legacy_path):
+        """Import a legacy sessions.json list once and rename it to .bak."""
+        legacy_path = os.fspath(legacy_path)
+        if not os.path.exists(legacy_path):
+            return
+        with self._lock, file_lock(self.path):
+            try:
+                with open(legacy_path, encoding="utf-8") as f:
+                    records = json.load(f)
+            except (OSError, ValueError):
+                return  # gone: another instance migrated it first
+            existing = list(self)
+            self._write_atomic(records + existing)
+            os.replace(legacy_path, legacy_path + ".bak")
+
+    def _write_atomic(self, records):
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            for record in records:
+                f.write(_encode(record))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        _fsync_dir(self.path)
@@ -1,56 +1,72 @@
-import os
 """Tidskollen - Visual Time Timer."""
+import os
 import sys
 import gettext
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, Gio, GLib
-from tidskollen import __version__
+from tidskollen import __version__, writer
 from tidskollen.window import TidskollenWindow
-from tidskollen.accessibility import apply_large_text
-from tidskollen.accessibility import AccessibilityManager
+from tidskollen.settings import load_settings as _load_settings
+from tidskollen.settings import save_settings as _save_settings
 
 TEXTDOMAIN = "tidskollen"
 gettext.textdomain(TEXTDOMAIN)
 _ = gettext.gettext
 
-def _settings_path():
-    xdg = os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
-    d = os.path.join(xdg, "tidskollen")
-    os.makedirs(d, exist_ok=True)
-    return os.path.join(d, "settings.json")
-
-def _load_settings():
-    p = _settings_path()
-    if os.path.exists(p):
-        import json
-        with open(p) as f:
-            return json.load(f)
-    return {}
-
-def _save_settings(s):
-    import json
-    with open(_settings_path(), "w") as f:
-        json.dump(s, f, indent=2)
-
 class TidskollenApp(Adw.Application):
     def __init__(self):
         super().__init__(application_id="se.yeager.tidskollen",
-        GLib.set_application_name(_("Time Check"))
                          flags=Gio.ApplicationFlags.DEFAULT_FLAGS)
+        GLib.set_application_name(_("Time Check"))
+        self.settings = _load_settings()
+        self.accessibility = None
+        self.plugins = None
 
     def do_activate(self):
-        apply_large_text()
-        win = self.props.active_window or TidskollenWindow(application=self)
+        win = self.props.active_window
+        if win is None:
+            win = TidskollenWindow(application=self)
+            _restore_session(win, "tidskollen")
+            win.connect("close-request", lambda w: _save_session(w, "tidskollen"))
         win.present()
         if not self.settings.get("welcome_shown"):
             self._show_welcome(win)
+        # Everything not needed for the first frame waits until after it.
+        GLib.idle_add(self._after_first_frame, win, priority=GLib.PRIORITY_LOW)
+
+    def _after_first_frame(self, win):
+        if self.accessibility is None:
+            from tidskollen.accessibility import AccessibilityManager
+            self.accessibility = AccessibilityManager(win, self)
+        if self.plugins is None:
+            from tidskollen.plugins import PluginHost
+            self.plugins = PluginHost("tidskollen").scan()
+            # Import plugins one at a time while the main loop is otherwise
+            # idle, those without hooks first since nothing else loads them,
+            # so the first Start click does not pay for an import.
+            legacy = self.plugins.legacy()
+            rest = [p for p in self.plugins.plugins if p.hooks]
+            for plugin in legacy + rest:
+                GLib.idle_add(self._load_plugin, plugin, priority=GLib.PRIORITY_LOW)
+        return GLib.SOURCE_REMOVE
+
+    def _load_plugin(self, plugin):
+        self.plugins.load(plugin)
+        return GLib.SOURCE_REMOVE
 
     def do_startup(self):
         Adw.Application.do_startup(self)
         self._setup_actions()
 
+    def do_shutdown(self):
+        if self.plugins is not None and os.environ.get("TIDSKOLLEN_PLUGIN_STATS"):
+            print(self.plugins.report())
+        # Everything is saved on the background writer; wait for it here.
+        writer.get_default().flush()
+        Adw.Application.do_shutdown(self)
+
     def _setup_actions(self):
         quit_action = Gio.SimpleAction.new("quit", None)
         quit_action.connect("activate", lambda *_: self.quit())
@@ -118,10 +134,6 @@ class TidskollenApp(Adw.Application):
         win.set_transient_for(self.props.active_window)
         win.present()
 
-def main():
-    app = TidskollenApp()
-    app.run(sys.argv)
-
     # ── Welcome Dialog ───────────────────────────────────────
 
     def _show_welcome(self, win):
@@ -150,6 +162,7 @@ def main():
         hb.set_show_title(False)
         box.add_top_bar(hb)
         box.set_content(page)
+        dialog.set_child(box)
         dialog.present(win)
 
     def _on_welcome_close(self, btn, dialog):
@@ -157,6 +170,11 @@ def main():
         _save_settings(self.settings)
         dialog.close()
 
+
+def main():
+    app = TidskollenApp()
+    app.run(sys.argv)
+
 # --- Session restore ---
 import json as _json
 import os as _os
@@ -166,11 +184,9 @@ def _save_session(window, app_name):
     _os.makedirs(config_dir, exist_ok=True)
     state = {'width': window.get_width(), 'height': window.get_height(),
              'maximized': window.is_maximized()}
-    try:
-        with open(_os.path.join(config_dir, 'session.json'), 'w') as f:
-            _json.dump(state, f)
-    except OSError:
-        pass
+    writer.get_default().write(_os.path.join(config_dir, 'session.json'),
+                               _json.dumps(state))
+    return False
 
 def _restore_session(window, app_name):
     path = _os.path.join(_os.path.expanduser('~'), '.config', app_name, 'session.json')
@@ -195,28 +211,6 @@ def _setup_fullscreen(window, app):
         app.add_action(action)
         app.set_accels_for_action('app.toggle-fullscreen', ['F11'])
 
-# --- Plugin system ---
-import importlib.util
-import os as _pos
-
-def _load_plugins(app_name):
-    """Load plugins from ~/.config/<app>/plugins/."""
-    plugin_dir = _pos.path.join(_pos.path.expanduser('~'), '.config', app_name, 'plugins')
-    plugins = []
-    if not _pos.path.isdir(plugin_dir):
-        return plugins
-    for fname in sorted(_pos.listdir(plugin_dir)):
-        if fname.endswith('.py') and not fname.startswith('_'):
-            path = _pos.path.join(plugin_dir, fname)
-            try:
-                spec = importlib.util.spec_from_file_location(fname[:-3], path)
-                mod = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(mod)
-                plugins.append(mod)
-            except Exception as e:
-                print(f"Plugin {fname}: {e}")
-    return plugins
-
 # --- Sound notifications ---
 def _play_sound(sound_name='complete'):
     """Play a system notification sound."""
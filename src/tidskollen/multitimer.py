@@ -0,0 +1,89 @@
+"""Drive many TimerEngines from one heap of upcoming second boundaries."""
+import heapq
+import itertools
+
+from tidskollen.timer import monotonic
+
+
+class DeadlineHeap:
+    """Schedules polls for any number of engines with a single timeout.
+
+    Each running engine has one heap entry for the moment its displayed
+    second next changes. Only the earliest entry is armed as a GLib timeout;
+    entries falling within ``slack`` seconds of it are served by the same
+    wakeup. Paused or removed engines are dropped lazily when popped.
+    """
+
+    def __init__(self, slack=0.05, clock=monotonic,
+                 timeout_add=None, source_remove=None):
+        if timeout_add is None:
+            from gi.repository import GLib
+            timeout_add = GLib.timeout_add
+            source_remove = GLib.source_remove
+        self._slack = slack
+        self._clock = clock
+        self._timeout_add = timeout_add
+        self._source_remove = source_remove
+        self._heap = []
+        self._seq = itertools.count()
+        self._generation = {}
+        self._source = None
+        self._armed_for = None
+        self.wakeups = 0
+
+    def __len__(self):
+        return len(self._generation)
+
+    def add(self, engine):
+        self._generation[engine] = 0
+        engine.subscribe(self._on_event)
+        if engine.running:
+            self._push(engine)
+            self._rearm()
+
+    def remove(self, engine):
+        engine.unsubscribe(self._on_event)
+        self._generation.pop(engine, None)
+
+    def _on_event(self, engine, event):
+        if event in ("start", "seek") and engine.running:
+            self._push(engine)
+            self._rearm()
+        elif event in ("pause", "reset", "finish"):
+            # Invalidate the pending entry; it is discarded when popped.
+            self._generation[engine] += 1
+
+    def _push(self, engine):
+        gen = self._generation[engine] + 1
+        self._generation[engine] = gen
+        due = self._clock() + engine.until_next_second()
+        heapq.heappush(self._heap, (due, next(self._seq), gen, engine))
+
+    def _rearm(self):
+        while self._heap and self._heap[0][2] != self._generation.get(self._heap[0][3]):
+            heapq.heappop(self._heap)
+        target = self._heap[0][0] + self._slack if self._heap else None
+        if self._source is not None:
+            if target is not None and self._armed_for <= target:
+                return
+            self._source_remove(self._source)
+            self._source = None
+        if target is not None:
+            self._armed_for = target
+            delay = max(0.0, target - self._clock())
+            self._source = self._timeout_add(int(delay * 1000) + 1, self._fire)
+
+    def _fire(self):
+        self._source = None
+        self.wakeups += 1
+        now = self._clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _at, _seq, gen, engine = heapq.heappop(self._heap)
+            if gen == self._generation.get(engine):
+                due.append(engine)
+        for engine in due:
+            if engine.poll():
+                self._push(engine)
+        self._rearm()
+        return False
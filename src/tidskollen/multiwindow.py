@@ -0,0 +1,152 @@
+"""Station rotation window: many independent countdowns on one screen."""
+import gettext
+
+import gi
+gi.require_version('Gtk', '4.0')
+gi.require_version('Adw', '1')
+from gi.repository import Gtk, Adw
+
+from tidskollen.dial import DialPainter
+from tidskollen.multitimer import DeadlineHeap
+from tidskollen.timer import TimerEngine
+from tidskollen.window import PRESET_TIMES, follow_dark_theme
+
+_ = gettext.gettext
+
+
+class MiniTimerView(Gtk.DrawingArea):
+    """Small dial that redraws only when its engine's shown second changes."""
+
+    def __init__(self, engine):
+        super().__init__()
+        self._engine = engine
+        self._painter = DialPainter()
+        self.set_content_width(180)
+        self.set_content_height(180)
+        self.set_draw_func(self._draw)
+        follow_dark_theme(self, self._painter)
+        engine.subscribe(lambda *_: self.queue_draw())
+
+    def _draw(self, area, cr, width, height):
+        engine = self._engine
+        shown = engine.remaining_seconds
+        fraction = shown / engine.duration if engine.duration > 0 else 0
+        self._painter.paint(cr, width, height, fraction, shown,
+                            self.get_scale_factor())
+
+
+class StationCard(Gtk.Box):
+    def __init__(self, name, engine, on_remove):
+        super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        self.engine = engine
+        self.add_css_class("card")
+
+        self._label = Gtk.Label(label=name)
+        self._label.add_css_class("heading")
+        self._label.set_margin_top(6)
+        self.append(self._label)
+        self.append(MiniTimerView(engine))
+
+        buttons = Gtk.Box(spacing=6, halign=Gtk.Align.CENTER)
+        buttons.set_margin_bottom(6)
+        self._toggle_btn = Gtk.Button(label=_("Start"))
+        self._toggle_btn.add_css_class("pill")
+        self._toggle_btn.connect("clicked", self._on_toggle)
+        buttons.append(self._toggle_btn)
+
+        reset_btn = Gtk.Button(icon_name="view-refresh-symbolic",
+                               tooltip_text=_("Reset"))
+        reset_btn.connect("clicked", lambda *_: engine.reset())
+        buttons.append(reset_btn)
+
+        remove_btn = Gtk.Button(icon_name="user-trash-symbolic",
+                                tooltip_text=_("Remove"))
+        remove_btn.connect("clicked", lambda *_: on_remove(self))
+        buttons.append(remove_btn)
+        self.append(buttons)
+
+        engine.subscribe(self._on_engine_event)
+
+    def _on_toggle(self, btn):
+        if self.engine.running:
+            self.engine.pause()
+        else:
+            self.engine.start()
+
+    def _on_engine_event(self, engine, event):
+        if event != "tick":
+            self._toggle_btn.set_label(_("Pause") if engine.running else _("Start"))
+
+
+class MultiTimerWindow(Adw.ApplicationWindow):
+    """Grid of station timers sharing one DeadlineHeap."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs, default_width=900, default_height=650,
+                         title=_("Stations"))
+        self._heap = DeadlineHeap()
+        self._count = 0
+
+        toolbar = Adw.ToolbarView()
+        header = Adw.HeaderBar()
+        toolbar.add_top_bar(header)
+
+        self._duration = Gtk.DropDown.new_from_strings(
+            [f"{mins}m" for mins in PRESET_TIMES])
+        self._duration.set_selected(PRESET_TIMES.index(10))
+        header.pack_start(self._duration)
+
+        add_btn = Gtk.Button(icon_name="list-add-symbolic",
+                             tooltip_text=_("Add station"))
+        add_btn.connect("clicked", self._on_add)
+        header.pack_start(add_btn)
+
+        start_all = Gtk.Button(label=_("Start all"))
+        start_all.add_css_class("suggested-action")
+        start_all.connect("clicked", lambda *_: self._each(TimerEngine.start))
+        header.pack_end(start_all)
+
+        reset_all = Gtk.Button(label=_("Reset all"))
+        reset_all.connect("clicked", lambda *_: self._each(TimerEngine.reset))
+        header.pack_end(reset_all)
+
+        self._grid = Gtk.FlowBox(selection_mode=Gtk.SelectionMode.NONE,
+                                 homogeneous=True, row_spacing=12,
+                                 column_spacing=12, max_children_per_line=8)
+        self._grid.set_margin_top(12)
+        self._grid.set_margin_bottom(12)
+        self._grid.set_margin_start(12)
+        self._grid.set_margin_end(12)
+        scroller = Gtk.ScrolledWindow(child=self._grid, vexpand=True)
+
+        self._toasts = Adw.ToastOverlay(child=scroller)
+        toolbar.set_content(self._toasts)
+        self.set_content(toolbar)
+        self.connect("destroy", lambda *_: self._each(self._heap.remove))
+
+    def _cards(self):
+        child = self._grid.get_first_child()
+        while child is not None:
+            yield child.get_child()
+            child = child.get_next_sibling()
+
+    def _each(self, fn):
+        for card in list(self._cards()):
+            fn(card.engine)
+
+    def _on_add(self, *_args):
+        self._count += 1
+        mins = PRESET_TIMES[self._duration.get_selected()]
+        engine = TimerEngine(mins * 60)
+        name = _("Station %d") % self._count
+        engine.subscribe(lambda e, ev: ev == "finish" and self._on_finished(name))
+        self._heap.add(engine)
+        self._grid.append(StationCard(name, engine, self._on_remove))
+
+    def _on_remove(self, card):
+        self._heap.remove(card.engine)
+        card.engine.pause()
+        self._grid.remove(card.get_parent())
+
+    def _on_finished(self, name):
+        self._toasts.add_toast(Adw.Toast.new(_("%s: time's up!") % name))
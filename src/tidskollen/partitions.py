@@ -0,0 +1,194 @@
+"""Session history split into one partition per profile.
+
+The default profile keeps the original sessions.jsonl (or .db/.bin) next
+to the settings; every other profile gets its own file under sessions/.
+A partition is opened only when its profile is used, and a few recently
+used ones stay open in a small LRU. Reports across all profiles stream
+through the partitions one at a time.
+"""
+import collections
+import threading
+from pathlib import Path
+
+from tidskollen import writer
+from tidskollen.stats import SessionStats
+
+DEFAULT_PROFILE = "default"
+LRU_SIZE = 4
+_SUFFIXES = {"sqlite": ".db", "binary": ".bin"}
+
+
+class Partition:
+    """One profile's store, the sessions view handed to exporters, and its
+    running statistics.
+
+    Other app instances may log to the same store. Records therefore reach
+    ``sessions`` and ``stats`` only by reading the store's new tail with
+    read_new(), whoever wrote them, so each one is counted exactly once.
+    """
+
+    __slots__ = ("profile", "store", "sessions", "stats", "position", "_read_lock")
+
+    def __init__(self, profile, store, sessions, stats, position):
+        self.profile = profile
+        self.store = store
+        self.sessions = sessions
+        self.stats = stats
+        self.position = position
+        self._read_lock = threading.Lock()
+
+    def append(self, record, on_read=None):
+        """Record a session on the background writer.
+
+        on_read(records, rebuilt), if given, is then called on the writer
+        thread with the result of read_new().
+        """
+        writer.get_default().call(self._append, record, on_read,
+                                  fsync=self.store.path)
+
+    def _append(self, record, on_read):
+        self.store.append(record)
+        if on_read is not None:
+            on_read(*self.read_new())
+
+    def read_new(self):
+        """Records added since the last call, by this or any other instance.
+
+        Returns (records, rebuilt). If the store was replaced, records is
+        the whole history and rebuilt the statistics recomputed from it,
+        otherwise rebuilt is None. Reads the disk and, after a replacement,
+        walks the whole history, so call it off the main loop.
+        """
+        with self._read_lock:
+            records, self.position, reset = self.store.read_since(self.position)
+        rebuilt = None
+        if reset:
+            rebuilt = SessionStats(self.stats.path)
+            rebuilt.rebuild(records)
+        return records, rebuilt
+
+    def merge(self, records, rebuilt):
+        """Fold a read_new() result into sessions and stats (main loop)."""
+        if rebuilt is not None:
+            if isinstance(self.sessions, list):
+                self.sessions = records
+            self.stats = rebuilt
+        elif records:
+            if isinstance(self.sessions, list):
+                self.sessions.extend(records)
+            for record in records:
+                self.stats.add(record)
+        else:
+            return
+        self.stats.save()
+
+    def close(self):
+        # After any appends still queued for this store.
+        close = getattr(self.store, "close", None)
+        if close is not None:
+            writer.get_default().call(close)
+
+
+def _open_store(backend, path):
+    if backend == "sqlite":
+        # Queried on demand; rows are never all loaded into memory.
+        from tidskollen.sessiondb import SqliteSessionStore
+        return SqliteSessionStore(path)
+    if backend == "binary":
+        # Fixed-width records read through mmap, no dict per session.
+        from tidskollen.sessionbin import BinarySessionStore
+        return BinarySessionStore(path)
+    from tidskollen.journal import SessionJournal
+    return SessionJournal(path)
+
+
+class SessionPartitions:
+    """Opens per-profile partitions on demand; thread-safe."""
+
+    def __init__(self, root, backend=None, capacity=LRU_SIZE):
+        self.root = Path(root)
+        self.backend = backend
+        self._suffix = _SUFFIXES.get(backend, ".jsonl")
+        self._capacity = capacity
+        self._open = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _dir(self):
+        d = self.root / "sessions"
+        d.mkdir(parents=True, exist_ok=True)
+        return d
+
+    def path_for(self, profile):
+        if profile == DEFAULT_PROFILE:
+            return self.root / ("sessions" + self._suffix)
+        return self._dir() / (profile + self._suffix)
+
+    def _stats_path(self, profile):
+        if profile == DEFAULT_PROFILE:
+            return self.root / "stats.json"
+        return self._dir() / (profile + ".stats.json")
+
+    def profiles(self):
+        """Profiles that have a partition on disk, default first."""
+        names = sorted(p.name[:-len(self._suffix)] for p in self._dir().iterdir()
+                       if p.name.endswith(self._suffix))
+        return [DEFAULT_PROFILE] + [n for n in names if n != DEFAULT_PROFILE]
+
+    def get(self, profile):
+        """The open partition for profile, loading it if needed.
+
+        Loading reads the history, so call this off the main loop.
+        """
+        with self._lock:
+            part = self._open.get(profile)
+            if part is not None:
+                self._open.move_to_end(profile)
+                return part
+        part = self._load(profile)
+        with self._lock:
+            if profile in self._open:  # loaded concurrently
+                part.close()
+                return self._open[profile]
+            self._open[profile] = part
+            while len(self._open) > self._capacity:
+                _name, old = self._open.popitem(last=False)
+                old.close()
+        return part
+
+    def _load(self, profile):
+        path = self.path_for(profile)
+        store = _open_store(self.backend, path)
+        if profile == DEFAULT_PROFILE:
+            # Older versions kept one sessions.json list; it becomes the
+            # journal, which the other backends then import.
+            from tidskollen.journal import SessionJournal
+            legacy = self.root / "sessions.jsonl"
+            SessionJournal(legacy).migrate(self.root / "sessions.json")
+            if path != legacy:
+                store.migrate(legacy)
+        if self.backend in _SUFFIXES:
+            # Queried in place rather than loaded into memory.
+            position = store.position()
+            sessions = store
+        else:
+            sessions, position, _reset = store.read_since(None)
+        stats = SessionStats.load(self._stats_path(profile), sessions)
+        return Partition(profile, store, sessions, stats, position)
+
+    def iter_all(self):
+        """Yield every session of every profile with a "profile" key added,
+        reading one partition file at a time."""
+        for profile in self.profiles():
+            path = self.path_for(profile)
+            if not path.exists():
+                continue
+            store = _open_store(self.backend, path)
+            try:
+                for record in store:
+                    record = dict(record)
+                    record["profile"] = profile
+                    yield record
+            finally:
+                close = getattr(store, "close", None)
+                if close is not None:
+                    close()
@@ -0,0 +1,188 @@
+"""Plugins from ~/.config/tidskollen/plugins/, imported only when needed.
+
+A plugin is a .py file defining any of the functions in HOOKS. Which hooks
+a file defines is found by parsing it (never by running it), and the
+result is cached in .manifest.json together with the file's mtime and
+size, so unchanged plugins cost one stat() at startup. The app imports
+plugins one at a time from low-priority idle callbacks after the first
+frame; a hook that fires before then imports its plugin on the spot.
+
+Hooks run on the main loop, so each call is timed, including an import
+it had to do first. A hook that exceeds BUDGET_MS too often, or keeps
+raising, is switched off for the session.
+"""
+import ast
+import importlib.util
+import json
+import os
+import time
+
+from tidskollen import writer
+
+HOOKS = (
+    "on_timer_start",     # (engine)
+    "on_timer_pause",     # (engine)
+    "on_timer_reset",     # (engine)
+    "on_timer_tick",      # (engine), once per shown second while visible
+    "on_timer_finish",    # (engine)
+    "on_session_logged",  # (record)
+)
+BUDGET_MS = 50
+MAX_STRIKES = 3
+MANIFEST = ".manifest.json"
+
+
+def plugin_dir(app_name):
+    return os.path.join(os.path.expanduser('~'), '.config', app_name, 'plugins')
+
+
+def _scan_hooks(path):
+    """Names of the HOOKS defined at the top level of a source file."""
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), path)
+    return sorted(node.name for node in tree.body
+                  if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+                  and node.name in HOOKS)
+
+
+class _Plugin:
+    __slots__ = ("name", "path", "hooks", "module", "failed",
+                 "load_ms", "calls", "total_ms", "max_ms", "strikes", "disabled")
+
+    def __init__(self, name, path, hooks):
+        self.name = name
+        self.path = path
+        self.hooks = hooks
+        self.module = None
+        self.failed = False
+        self.load_ms = 0.0
+        self.calls = {}     # hook -> number of calls
+        self.total_ms = {}  # hook -> summed duration
+        self.max_ms = {}    # hook -> slowest call
+        self.strikes = {}   # hook -> over-budget calls and errors
+        self.disabled = set()
+
+
+class PluginHost:
+    """Scans the plugin directory and dispatches hooks to plugins."""
+
+    def __init__(self, app_name, budget_ms=BUDGET_MS, max_strikes=MAX_STRIKES):
+        self._dir = plugin_dir(app_name)
+        self._budget = budget_ms
+        self._max_strikes = max_strikes
+        self.plugins = []
+        self._by_hook = {}
+
+    def scan(self):
+        """Build the plugin list from the directory and the cached manifest."""
+        self.plugins = []
+        self._by_hook = {}
+        if not os.path.isdir(self._dir):
+            return self
+        manifest_path = os.path.join(self._dir, MANIFEST)
+        try:
+            with open(manifest_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = {}
+        manifest = {}
+        for fname in sorted(os.listdir(self._dir)):
+            if not fname.endswith('.py') or fname.startswith('_'):
+                continue
+            path = os.path.join(self._dir, fname)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = cached.get(fname)
+            if not entry or entry.get("mtime") != st.st_mtime_ns or entry.get("size") != st.st_size:
+                entry = {"name": fname[:-3], "hooks": [],
+                         "mtime": st.st_mtime_ns, "size": st.st_size}
+                try:
+                    entry["hooks"] = _scan_hooks(path)
+                except (OSError, SyntaxError, ValueError) as e:
+                    # Remembered until the file changes, like any entry.
+                    print(f"Plugin {fname}: {e}")
+                    entry["error"] = str(e)
+            manifest[fname] = entry
+            if entry.get("error"):
+                continue
+            plugin = _Plugin(entry["name"], path, entry["hooks"])
+            self.plugins.append(plugin)
+            for hook in plugin.hooks:
+                self._by_hook.setdefault(hook, []).append(plugin)
+        if manifest != cached:
+            writer.get_default().write(manifest_path, json.dumps(manifest, indent=2))
+        return self
+
+    def legacy(self):
+        """Plugins without any hooks, which can only work by being imported."""
+        return [p for p in self.plugins if not p.hooks]
+
+    def load(self, plugin):
+        """Import a plugin now. Returns its module, or None if it failed."""
+        if plugin.module is None and not plugin.failed:
+            started = time.perf_counter()
+            try:
+                spec = importlib.util.spec_from_file_location(
+                    f"tidskollen_plugin_{plugin.name}", plugin.path)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                plugin.module = module
+            except Exception as e:
+                print(f"Plugin {plugin.name}: {e}")
+                plugin.failed = True
+            plugin.load_ms = (time.perf_counter() - started) * 1000
+        return plugin.module
+
+    def has(self, hook):
+        return hook in self._by_hook
+
+    def emit(self, hook, *args):
+        """Call hook(*args) in every plugin that defines it."""
+        for plugin in self._by_hook.get(hook, ()):
+            if hook in plugin.disabled:
+                continue
+            # An import done here stalls the main loop like a slow hook.
+            importing = plugin.module is None and not plugin.failed
+            module = self.load(plugin)
+            stall = plugin.load_ms if importing else 0.0
+            fn = getattr(module, hook, None)
+            if fn is None:
+                plugin.disabled.add(hook)
+                continue
+            started = time.perf_counter()
+            error = None
+            try:
+                fn(*args)
+            except Exception as e:
+                error = e
+            elapsed = (time.perf_counter() - started) * 1000
+            plugin.calls[hook] = plugin.calls.get(hook, 0) + 1
+            plugin.total_ms[hook] = plugin.total_ms.get(hook, 0.0) + elapsed
+            plugin.max_ms[hook] = max(plugin.max_ms.get(hook, 0.0), elapsed)
+            if error is not None:
+                print(f"Plugin {plugin.name}.{hook}: {error}")
+            if error is not None or stall + elapsed > self._budget:
+                strikes = plugin.strikes[hook] = plugin.strikes.get(hook, 0) + 1
+                if strikes >= self._max_strikes:
+                    plugin.disabled.add(hook)
+                    print(f"Plugin {plugin.name}.{hook} disabled: "
+                          f"{strikes} calls failed or took over {self._budget} ms")
+
+    def report(self):
+        """One line per plugin hook with its timing counters."""
+        lines = []
+        for plugin in self.plugins:
+            state = "not loaded" if plugin.module is None and not plugin.failed else (
+                "failed" if plugin.failed else f"loaded in {plugin.load_ms:.1f} ms")
+            lines.append(f"{plugin.name}: {state}")
+            for hook in plugin.hooks:
+                calls = plugin.calls.get(hook, 0)
+                if not calls:
+                    continue
+                mean = plugin.total_ms[hook] / calls
+                flag = " (disabled)" if hook in plugin.disabled else ""
+                lines.append(f"  {hook}: {calls} calls, mean {mean:.2f} ms, "
+                             f"max {plugin.max_ms[hook]:.2f} ms{flag}")
+        return "\n".join(lines)
@@ -2,20 +2,49 @@
 # --- User profiles ---
 import json as _pjson
 import os as _pos2
+import threading as _pthreading
+
+from tidskollen import writer as _writer
+
+try:
+    from gi.repository import Gio as _Gio
+except ImportError:  # used without a main loop, e.g. from scripts
+    _Gio = None
+
 
 class ProfileManager:
-    """Simple user profile management for barn-appar."""
+    """Simple user profile management for barn-appar.
+
+    The list of profiles and the current profile's data are cached in
+    memory. A file monitor on the profiles directory drops the cache when
+    another process changes it. Writes from save_data() and switch() go to
+    the background writer, which coalesces bursts of changes into one
+    atomic write per file.
+    """
 
     def __init__(self, app_name):
         self._app_name = app_name
         self._dir = _pos2.path.join(_pos2.path.expanduser('~'), '.config', app_name, 'profiles')
         _pos2.makedirs(self._dir, exist_ok=True)
         self._current = self._load_current()
+        self._index = None
+        self._data = None
+        self._pending = {}  # file name -> writes queued but not yet done
+        self._written = {}  # file name -> mtime of our own last write
+        self._lock = _pthreading.Lock()
+        self._monitor = None
+        if _Gio is not None:
+            self._monitor = _Gio.File.new_for_path(self._dir).monitor_directory(
+                _Gio.FileMonitorFlags.WATCH_MOVES, None)
+            self._monitor.connect('changed', self._on_dir_changed)
+
+    def _path(self, name):
+        return _pos2.path.join(self._dir, name)
 
     def _load_current(self):
         try:
-            with open(_pos2.path.join(self._dir, '.current')) as f:
-                return f.read().strip()
+            with open(self._path('.current')) as f:
+                return f.read().strip() or 'default'
         except (FileNotFoundError, OSError):
             return 'default'
 
@@ -24,24 +53,67 @@ class ProfileManager:
         return self._current
 
     def switch(self, name):
+        """Make name current; its data is read on the next load_data()."""
+        if name == self._current:
+            return
         self._current = name
-        with open(_pos2.path.join(self._dir, '.current'), 'w') as f:
-            f.write(name)
+        self._data = None
+        self._queue('.current', name)
 
     def list_profiles(self):
-        profiles = ['default']
-        for f in sorted(_pos2.listdir(self._dir)):
-            if f.endswith('.json') and f != '.current':
-                profiles.append(f[:-5])
-        return list(set(profiles))
+        """Profile names, 'default' first and the rest sorted."""
+        if self._index is None:
+            names = sorted(f[:-5] for f in _pos2.listdir(self._dir)
+                           if f.endswith('.json') and not f.startswith('.'))
+            self._index = ['default'] + [n for n in names if n != 'default']
+        return list(self._index)
 
     def save_data(self, data):
-        with open(_pos2.path.join(self._dir, f'{self._current}.json'), 'w') as f:
-            _pjson.dump(data, f, ensure_ascii=False, indent=2)
+        self._data = data
+        if self._index is not None and self._current not in self._index:
+            self._index = None
+        self._queue(f'{self._current}.json',
+                    _pjson.dumps(data, ensure_ascii=False, indent=2))
 
     def load_data(self):
+        """The current profile's data. The dict is cached; pass it back to
+        save_data() after changing it."""
+        if self._data is None:
+            try:
+                with open(self._path(f'{self._current}.json')) as f:
+                    self._data = _pjson.load(f)
+            except (FileNotFoundError, _pjson.JSONDecodeError):
+                self._data = {}
+        return self._data
+
+    def _queue(self, name, text):
+        with self._lock:
+            self._pending[name] = self._pending.get(name, 0) + 1
+        _writer.get_default().write(self._path(name), text, self._on_written)
+
+    def _on_written(self, path):
+        # Runs on the writer thread, once per queued write.
+        name = _pos2.path.basename(path)
+        try:
+            self._written[name] = _pos2.stat(path).st_mtime_ns
+        except OSError:
+            pass
+        with self._lock:
+            left = self._pending.get(name, 1) - 1
+            if left > 0:
+                self._pending[name] = left
+            else:
+                self._pending.pop(name, None)
+
+    def _on_dir_changed(self, monitor, file, other_file, event):
+        self._index = None
+        target = other_file if other_file is not None else file
+        name = target.get_basename()
+        if name != f'{self._current}.json' or name in self._pending:
+            return
         try:
-            with open(_pos2.path.join(self._dir, f'{self._current}.json')) as f:
-                return _pjson.load(f)
-        except (FileNotFoundError, _pjson.JSONDecodeError):
-            return {}
+            mtime = _pos2.stat(target.get_path()).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime is None or mtime != self._written.get(name):
+            self._data = None  # changed by someone else; re-read lazily
@@ -0,0 +1,186 @@
+"""Paginated PDF session report.
+
+Page geometry is computed once. The table header and the page footer are
+drawn once into recording surfaces and replayed on every page, and cell text
+is shaped once per distinct string and drawn with show_glyphs().
+"""
+import gettext
+from datetime import datetime
+
+_ = gettext.gettext
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 40
+COLUMNS = (40, 200, 380)
+ROW_HEIGHT = 18
+ROW_FONT = 11
+HEADER_FONT = 13
+FOOTER_FONT = 9
+
+
+class _Layout:
+    """Vertical positions shared by every page."""
+
+    def __init__(self):
+        self.title_y = 50
+        self.first_table_y = 110
+        self.table_y = 60
+        self.header_height = 24
+        self.bottom = PAGE_HEIGHT - 50
+        self.footer_y = PAGE_HEIGHT - 20
+
+
+class _GlyphCache:
+    """Glyph runs at the origin, keyed by string.
+
+    Pages are drawn with an identity matrix, so a run is placed by
+    translating and then resetting the matrix.
+    """
+
+    def __init__(self, ctx, size, bold=False):
+        self._ctx = ctx
+        ctx.save()
+        ctx.select_font_face("Sans", 0, 1 if bold else 0)
+        ctx.set_font_size(size)
+        self.font = ctx.get_scaled_font()
+        ctx.restore()
+        self._runs = {}
+
+    def show(self, text, x, y):
+        run = self._runs.get(text)
+        if run is None:
+            run = self._runs[text] = self.font.text_to_glyphs(0, 0, text, False)
+        ctx = self._ctx
+        ctx.set_scaled_font(self.font)
+        ctx.translate(x, y)
+        ctx.show_glyphs(run)
+        ctx.identity_matrix()
+
+
+def _record(cairo, draw):
+    surface = cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA, None)
+    draw(cairo.Context(surface))
+    return surface
+
+
+def _draw_header(ctx):
+    ctx.select_font_face("Sans", 0, 1)
+    ctx.set_font_size(HEADER_FONT)
+    ctx.set_source_rgb(0.3, 0.3, 0.3)
+    for x, label in zip(COLUMNS, (_("Date"), _("Duration (min)"), _("Completed"))):
+        ctx.move_to(x, 0)
+        ctx.show_text(label)
+    ctx.set_line_width(0.5)
+    ctx.move_to(MARGIN, 8)
+    ctx.line_to(PAGE_WIDTH - MARGIN, 8)
+    ctx.stroke()
+
+
+def _day_of(session):
+    date = session.get("date", "")
+    return date[:10], date[11:]
+
+
+class ReportRenderer:
+    """Streams sessions into a PDF, grouped per day with summary rows."""
+
+    def __init__(self, cairo, output_path, title, footer):
+        self._layout = _Layout()
+        self._surface = cairo.PDFSurface(output_path, PAGE_WIDTH, PAGE_HEIGHT)
+        self._ctx = cairo.Context(self._surface)
+        self._title = title
+        self._header = _record(cairo, _draw_header)
+        self._footer = _record(cairo, lambda ctx: self._draw_footer(ctx, footer))
+        self._rows = _GlyphCache(self._ctx, ROW_FONT)
+        self._bold = _GlyphCache(self._ctx, ROW_FONT, bold=True)
+        self._small = _GlyphCache(self._ctx, FOOTER_FONT)
+        self._page = 0
+        self._y = 0
+
+    @staticmethod
+    def _draw_footer(ctx, footer):
+        ctx.select_font_face("Sans", 0, 0)
+        ctx.set_font_size(FOOTER_FONT)
+        ctx.set_source_rgb(0.5, 0.5, 0.5)
+        ctx.move_to(MARGIN, 0)
+        ctx.show_text(footer)
+
+    def _new_page(self):
+        ctx = self._ctx
+        if self._page:
+            self._surface.show_page()
+        self._page += 1
+        layout = self._layout
+        if self._page == 1:
+            ctx.select_font_face("Sans", 0, 0)
+            ctx.set_source_rgb(0, 0, 0)
+            ctx.set_font_size(24)
+            ctx.move_to(MARGIN, layout.title_y)
+            ctx.show_text(self._title)
+            ctx.set_font_size(12)
+            ctx.move_to(MARGIN, layout.title_y + 25)
+            ctx.show_text(datetime.now().strftime("%Y-%m-%d"))
+            top = layout.first_table_y
+        else:
+            top = layout.table_y
+        ctx.set_source_surface(self._header, 0, top)
+        ctx.paint()
+        ctx.set_source_surface(self._footer, 0, layout.footer_y)
+        ctx.paint()
+        ctx.set_source_rgb(0.5, 0.5, 0.5)
+        self._small.show(str(self._page), PAGE_WIDTH - MARGIN - 20, layout.footer_y)
+        ctx.set_source_rgb(0, 0, 0)
+        self._y = top + layout.header_height
+
+    def _advance(self):
+        if not self._page or self._y + ROW_HEIGHT > self._layout.bottom:
+            self._new_page()
+        y = self._y
+        self._y += ROW_HEIGHT
+        return y
+
+    def _row(self, cache, cells):
+        y = self._advance()
+        for x, text in zip(COLUMNS, cells):
+            if text:
+                cache.show(text, x, y)
+
+    def _summary(self, label, count, minutes, completed):
+        self._ctx.set_source_rgb(0.3, 0.3, 0.3)
+        self._row(self._bold, (label, str(minutes), f"{completed}/{count}"))
+        self._ctx.set_source_rgb(0, 0, 0)
+
+    def render(self, sessions):
+        day = None
+        count = minutes = completed = 0
+        totals = [0, 0, 0]
+        for s in sessions:
+            date, clock = _day_of(s)
+            if date != day:
+                if day is not None:
+                    self._summary(_("Total"), count, minutes, completed)
+                day = date
+                count = minutes = completed = 0
+                self._row(self._bold, (date,))
+            duration = s.get("duration", 0)
+            done = bool(s.get("completed"))
+            self._row(self._rows, (clock, str(duration), "✓" if done else "✗"))
+            count += 1
+            minutes += duration
+            completed += done
+            totals[0] += 1
+            totals[1] += duration
+            totals[2] += done
+        if day is not None:
+            self._summary(_("Total"), count, minutes, completed)
+            self._advance()
+            self._summary(_("All sessions"), *totals)
+        if not self._page:
+            self._new_page()
+        self._surface.finish()
+        return self._page
+
+
+def render_report(cairo, sessions, output_path, title, footer):
+    """Render sessions to output_path. Returns the number of pages."""
+    return ReportRenderer(cairo, output_path, title, footer).render(sessions)
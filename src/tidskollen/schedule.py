@@ -0,0 +1,58 @@
+"""Activity schedules: a sequence of timed segments run as one countdown."""
+import bisect
+import itertools
+
+
+class Segment:
+    __slots__ = ("label", "seconds")
+
+    def __init__(self, label, seconds):
+        self.label = label
+        self.seconds = int(seconds)
+
+
+class Schedule:
+    """Segments with precomputed cumulative end offsets.
+
+    The whole schedule runs on a single TimerEngine of ``total`` seconds;
+    the active segment for any elapsed time is found by binary search, so
+    resuming or seeking in a long schedule costs O(log n).
+    """
+
+    def __init__(self, segments):
+        self.segments = [s for s in segments if s.seconds > 0]
+        self._ends = list(itertools.accumulate(s.seconds for s in self.segments))
+
+    def __len__(self):
+        return len(self.segments)
+
+    @property
+    def total(self):
+        return self._ends[-1] if self._ends else 0
+
+    def start_of(self, index):
+        return self._ends[index - 1] if index > 0 else 0
+
+    def locate(self, elapsed):
+        """Return (index, seconds left in that segment) for an elapsed time."""
+        if not self._ends:
+            return -1, 0.0
+        index = min(bisect.bisect_right(self._ends, elapsed), len(self._ends) - 1)
+        return index, max(0.0, self._ends[index] - elapsed)
+
+    def next_remaining(self, remaining):
+        """Remaining time at the start of the segment after the current one.
+
+        Returns None while the last segment is running.
+        """
+        index, _left = self.locate(self.total - remaining)
+        if index + 1 >= len(self.segments):
+            return None
+        return self.total - self.start_of(index + 1)
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(Segment(d.get("label", ""), d.get("seconds", 0)) for d in data)
+
+    def to_data(self):
+        return [{"label": s.label, "seconds": s.seconds} for s in self.segments]
@@ -0,0 +1,95 @@
+"""Editor dialog for activity schedules."""
+import gettext
+
+import gi
+gi.require_version('Gtk', '4.0')
+gi.require_version('Adw', '1')
+from gi.repository import Gtk, Adw
+
+_ = gettext.gettext
+
+
+class _SegmentRow(Gtk.Box):
+    def __init__(self, label, minutes, on_remove):
+        super().__init__(spacing=6)
+        self.set_margin_top(4)
+        self.set_margin_bottom(4)
+        self.set_margin_start(6)
+        self.set_margin_end(6)
+
+        self.entry = Gtk.Entry(text=label, hexpand=True,
+                               placeholder_text=_("Activity"))
+        self.append(self.entry)
+
+        self.minutes = Gtk.SpinButton.new_with_range(1, 240, 1)
+        self.minutes.set_value(minutes)
+        self.minutes.set_tooltip_text(_("Minutes"))
+        self.append(self.minutes)
+
+        remove_btn = Gtk.Button(icon_name="list-remove-symbolic",
+                                tooltip_text=_("Remove"))
+        remove_btn.add_css_class("flat")
+        remove_btn.connect("clicked", lambda *_: on_remove(self))
+        self.append(remove_btn)
+
+    def to_data(self):
+        return {"label": self.entry.get_text().strip(),
+                "seconds": int(self.minutes.get_value()) * 60}
+
+
+def show_schedule_dialog(window, segments, on_start):
+    """Edit a list of {"label", "seconds"} dicts; on_start(segments) runs it."""
+    dialog = Adw.Dialog()
+    dialog.set_title(_("Schedule"))
+    dialog.set_content_width(420)
+    dialog.set_content_height(480)
+
+    rows = Gtk.ListBox(selection_mode=Gtk.SelectionMode.NONE)
+    rows.add_css_class("boxed-list")
+
+    def remove(row):
+        rows.remove(row.get_parent())
+
+    def add(label="", minutes=5):
+        rows.append(_SegmentRow(label, minutes, remove))
+
+    for seg in segments:
+        add(seg.get("label", ""), max(1, seg.get("seconds", 0) // 60))
+    if not segments:
+        add()
+
+    def collect():
+        data = []
+        child = rows.get_first_child()
+        while child is not None:
+            data.append(child.get_child().to_data())
+            child = child.get_next_sibling()
+        return data
+
+    def start(*_args):
+        dialog.close()
+        on_start(collect())
+
+    add_btn = Gtk.Button(label=_("Add Activity"))
+    add_btn.connect("clicked", lambda *_: add())
+    start_btn = Gtk.Button(label=_("Start Schedule"))
+    start_btn.add_css_class("suggested-action")
+    start_btn.connect("clicked", start)
+
+    buttons = Gtk.Box(spacing=12, halign=Gtk.Align.CENTER)
+    buttons.append(add_btn)
+    buttons.append(start_btn)
+
+    box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+    box.set_margin_top(12)
+    box.set_margin_bottom(12)
+    box.set_margin_start(12)
+    box.set_margin_end(12)
+    box.append(rows)
+    box.append(buttons)
+
+    view = Adw.ToolbarView()
+    view.add_top_bar(Adw.HeaderBar())
+    view.set_content(Gtk.ScrolledWindow(child=box, vexpand=True))
+    dialog.set_child(view)
+    dialog.present(window)
@@ -0,0 +1,123 @@
+"""A single once-a-second wakeup shared by the clock label and running timers."""
+import collections
+import math
+import time
+
+from tidskollen.timer import monotonic as _monotonic
+
+_default = None
+
+
+def get_default():
+    """Return the process-wide scheduler, creating it on first use."""
+    global _default
+    if _default is None:
+        _default = SecondScheduler()
+    return _default
+
+
+class Subscription:
+    """Handle returned by SecondScheduler.subscribe()."""
+
+    def __init__(self, scheduler, callback, active):
+        self._scheduler = scheduler
+        self.callback = callback
+        self.active = active
+        self.deadline = None
+
+    def set_active(self, active):
+        """Active subscriptions are called at every wall-clock second."""
+        if active != self.active:
+            self.active = active
+            self._scheduler._rearm()
+
+    def set_deadline(self, deadline):
+        """Also wake exactly at this timer.monotonic() value (or None)."""
+        if deadline != self.deadline:
+            self.deadline = deadline
+            self._scheduler._rearm()
+
+    def cancel(self):
+        self._scheduler._remove(self)
+
+
+class SecondScheduler:
+    """Coalesces all periodic UI updates into one timeout.
+
+    The timeout is aligned to real (wall-clock) second boundaries and is only
+    armed while some subscription is active or has a pending deadline, so an
+    idle or hidden window does not wake the CPU at all.
+    """
+
+    def __init__(self, clock=time.time, monotonic=_monotonic,
+                 timeout_add=None, source_remove=None):
+        if timeout_add is None:
+            from gi.repository import GLib
+            timeout_add = GLib.timeout_add
+            source_remove = GLib.source_remove
+        self._clock = clock
+        self._monotonic = monotonic
+        self._timeout_add = timeout_add
+        self._source_remove = source_remove
+        self._subs = []
+        self._source = None
+        self._armed_for = None
+        self.wakeups = 0
+        self._recent = collections.deque()
+
+    def subscribe(self, callback, active=True):
+        sub = Subscription(self, callback, active)
+        self._subs.append(sub)
+        self._rearm()
+        return sub
+
+    def _remove(self, sub):
+        if sub in self._subs:
+            self._subs.remove(sub)
+            self._rearm()
+
+    def wakeups_per_minute(self):
+        """Number of wakeups during the last 60 seconds."""
+        self._trim(self._monotonic())
+        return len(self._recent)
+
+    def _trim(self, now):
+        while self._recent and self._recent[0] <= now - 60:
+            self._recent.popleft()
+
+    def _next_delay(self):
+        delays = []
+        if any(sub.active for sub in self._subs):
+            delays.append(1.0 - math.modf(self._clock())[0])
+        now = self._monotonic()
+        delays.extend(max(0.0, sub.deadline - now)
+                      for sub in self._subs if sub.deadline is not None)
+        return min(delays) if delays else None
+
+    def _rearm(self):
+        delay = self._next_delay()
+        target = None if delay is None else self._monotonic() + delay
+        if self._source is not None:
+            # Keep the pending wakeup if it is already early enough.
+            if target is not None and self._armed_for <= target + 0.001:
+                return
+            self._source_remove(self._source)
+            self._source = None
+        if target is not None:
+            self._armed_for = target
+            self._source = self._timeout_add(int(delay * 1000) + 1, self._fire)
+
+    def _fire(self):
+        self._source = None
+        now = self._monotonic()
+        self.wakeups += 1
+        self._recent.append(now)
+        self._trim(now)
+        for sub in list(self._subs):
+            due = sub.deadline is not None and sub.deadline <= now
+            if sub.active or due:
+                if due:
+                    sub.deadline = None
+                sub.callback()
+        self._rearm()
+        return False
@@ -0,0 +1,272 @@
+"""Optional compact binary session store.
+
+Sessions are fixed-width records (see RECORD) after a short header, so a
+file of a million sessions is 16 MB and is read through mmap without
+creating a dict per session. Iteration yields SessionView objects that
+unpack their fields on access and still answer ``s.get("date")`` like the
+dict records the exporters expect.
+"""
+import mmap
+import os
+import struct
+import threading
+from datetime import datetime, timedelta
+
+from tidskollen.journal import file_lock
+from tidskollen.sessiondb import DATE_FORMAT, to_epoch
+
+MAGIC = b"TKSB"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+# started (epoch seconds), duration (minutes), flags, pad, profile id
+RECORD = struct.Struct("<qIBxH")
+FLAG_COMPLETED = 1
+_KEYS = ("date", "duration", "completed", "profile")
+
+
+class SessionView:
+    """Read-only view of one record inside the mapped file."""
+
+    __slots__ = ("_buf", "_offset", "_profiles")
+
+    def __init__(self, buf, offset, profiles):
+        self._buf = buf
+        self._offset = offset
+        self._profiles = profiles  # the store's id -> name list
+
+    def _fields(self):
+        return RECORD.unpack_from(self._buf, self._offset)
+
+    @property
+    def started(self):
+        return self._fields()[0]
+
+    @property
+    def duration(self):
+        return self._fields()[1]
+
+    @property
+    def completed(self):
+        return bool(self._fields()[2] & FLAG_COMPLETED)
+
+    @property
+    def profile_id(self):
+        return self._fields()[3]
+
+    @property
+    def profile(self):
+        profile_id = self.profile_id
+        if profile_id < len(self._profiles):
+            return self._profiles[profile_id]
+        return None
+
+    @property
+    def date(self):
+        return datetime.fromtimestamp(self.started).strftime(DATE_FORMAT)
+
+    # Enough of the mapping protocol for the exporters and dict(view).
+    def keys(self):
+        return _KEYS
+
+    def __getitem__(self, key):
+        if key not in _KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in _KEYS else default
+
+    def __repr__(self):
+        return "SessionView(%r)" % dict(self)
+
+
+class BinarySessionStore:
+    """Session history as fixed-width records, with the same append/iterate
+    interface as SessionJournal and SqliteSessionStore.
+
+    Appends are single O_APPEND writes of whole records; a torn tail from a
+    crash is ignored by readers and overwritten by the next append. The
+    file is re-mapped lazily when it has grown since the last read. Other
+    app instances may append to the same file; appends hold file_lock()
+    and the record count serves as the read_since() position.
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._map = None
+        self._mapped = 0
+        self._profiles = ["default"]
+        self._ensure_header()
+        self._load_profiles()
+
+    def _ensure_header(self):
+        try:
+            with open(self.path, "rb") as f:
+                head = f.read(HEADER.size)
+        except FileNotFoundError:
+            head = b""
+        if len(head) < HEADER.size:
+            with open(self.path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+            return
+        magic, version, size = HEADER.unpack(head)
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            raise ValueError("%s is not a Tidskollen session file" % self.path)
+
+    # Profile names are kept in a small sidecar, one per line; the line
+    # number is the id stored in each record.
+    def _profiles_path(self):
+        return self.path + ".profiles"
+
+    def _load_profiles(self):
+        try:
+            with open(self._profiles_path(), encoding="utf-8") as f:
+                names = [line.rstrip("\n") for line in f]
+        except FileNotFoundError:
+            return
+        if names:
+            self._profiles[:] = names  # in place: views share the list
+
+    def profile_id(self, name):
+        if name not in self._profiles:
+            with file_lock(self._profiles_path()):
+                self._load_profiles()  # another instance may have added it
+                if name not in self._profiles:
+                    self._profiles.append(name)
+                    with open(self._profiles_path(), "w", encoding="utf-8") as f:
+                        f.write("".join(n + "\n" for n in self._profiles))
+        return self._profiles.index(name)
+
+    def profile_name(self, profile_id):
+        if 0 <= profile_id < len(self._profiles):
+            return self._profiles[profile_id]
+        return None
+
+    # ── Reading ─────────────────────────────────────────────
+
+    def _buffer(self):
+        """The mapped file, re-mapped if it has grown."""
+        size = os.path.getsize(self.path)
+        if self._map is None or size != self._mapped:
+            # The old map is left to the views still pointing into it.
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped = size
+        return self._map
+
+    def close(self):
+        self._map = None
+
+    def __len__(self):
+        return (os.path.getsize(self.path) - HEADER.size) // RECORD.size
+
+    def __getitem__(self, index):
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError(index)
+        return SessionView(self._buffer(), HEADER.size + index * RECORD.size,
+                           self._profiles)
+
+    def _views(self, start=0, stop=None):
+        buf = self._buffer()
+        count = (len(buf) - HEADER.size) // RECORD.size
+        stop = count if stop is None else min(stop, count)
+        for i in range(start, stop):
+            yield SessionView(buf, HEADER.size + i * RECORD.size, self._profiles)
+
+    def __iter__(self):
+        return self._views()
+
+    def position(self):
+        return len(self)
+
+    def read_since(self, position):
+        """Records appended after position; returns (records, position, False)."""
+        views = list(self._views(position or 0))
+        return views, (position or 0) + len(views), False
+
+    def _started(self, buf, index):
+        return struct.unpack_from("<q", buf, HEADER.size + index * RECORD.size)[0]
+
+    def _bisect(self, buf, count, epoch):
+        """First index whose start time is >= epoch. Records are appended in
+        start order, so the file is sorted on that field."""
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._started(buf, mid) < epoch:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def between(self, start, end):
+        """Sessions with start time in [start, end)."""
+        buf = self._buffer()
+        count = (len(buf) - HEADER.size) // RECORD.size
+        lo = self._bisect(buf, count, to_epoch(start))
+        hi = self._bisect(buf, count, to_epoch(end))
+        return self._views(lo, hi)
+
+    def completion_by_week(self, start=None, end=None):
+        """Yield (week, sessions, completed, rate) with week as ISO "%G-%V"."""
+        buf = self._buffer()
+        count = (len(buf) - HEADER.size) // RECORD.size
+        lo = 0 if start is None else self._bisect(buf, count, to_epoch(start))
+        hi = count if end is None else self._bisect(buf, count, to_epoch(end))
+        weeks = {}
+        day = None
+        records = memoryview(buf)[HEADER.size + lo * RECORD.size:
+                                  HEADER.size + hi * RECORD.size]
+        for started, _duration, flags, _profile in RECORD.iter_unpack(records):
+            # strftime is the slow part; sessions come in runs per day.
+            if day is None or not day[0] <= started < day[1]:
+                midnight = datetime.fromtimestamp(started).replace(
+                    hour=0, minute=0, second=0, microsecond=0)
+                day = (midnight.timestamp(),
+                       (midnight + timedelta(days=1)).timestamp(),
+                       midnight.strftime("%G-%V"))
+            row = weeks.setdefault(day[2], [0, 0])
+            row[0] += 1
+            row[1] += flags & FLAG_COMPLETED
+        for week in sorted(weeks):
+            total, done = weeks[week]
+            yield week, total, done, done / total
+
+    # ── Writing ─────────────────────────────────────────────
+
+    def _pack(self, record):
+        return RECORD.pack(
+            to_epoch(record.get("started", record.get("date"))),
+            int(record.get("duration", 0)),
+            FLAG_COMPLETED if record.get("completed") else 0,
+            self.profile_id(record.get("profile", "default")))
+
+    def append(self, record):
+        self.extend([record])
+
+    def extend(self, records):
+        data = b"".join(self._pack(r) for r in records)
+        if not data:
+            return
+        with self._lock, file_lock(self.path):
+            size = os.path.getsize(self.path)
+            torn = (size - HEADER.size) % RECORD.size
+            if torn:
+                os.truncate(self.path, size - torn)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+
+    def migrate(self, journal_path):
+        """Import a JSONL journal once if the store is still empty."""
+        from tidskollen.journal import iter_jsonl
+        journal_path = os.fspath(journal_path)
+        if not os.path.exists(journal_path) or len(self):
+            return
+        self.extend(iter_jsonl(journal_path))
@@ -0,0 +1,127 @@
+"""Optional SQLite session store for long per-classroom histories."""
+import os
+import sqlite3
+from datetime import datetime
+
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    completed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_started ON sessions (started);
+"""
+
+
+# ISO "%G-%V" of the started column. SQLite only learned %G and %V in
+# 3.46, so go through the Thursday of the week, which decides both the
+# ISO year and the week number.
+_THURSDAY = "started, 'unixepoch', 'localtime', '-3 days', 'weekday 4'"
+_ISO_WEEK = ("strftime('%%Y', %s) || '-' || printf('%%02d', "
+             "(strftime('%%j', %s) - 1) / 7 + 1)" % (_THURSDAY, _THURSDAY))
+
+
+def to_epoch(value):
+    """Accept an epoch, a datetime or a "%Y-%m-%d %H:%M" string."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.strptime(value, DATE_FORMAT)
+    return int(value.timestamp())
+
+
+def _to_record(row):
+    started, duration, completed = row
+    return {
+        "date": datetime.fromtimestamp(started).strftime(DATE_FORMAT),
+        "duration": duration,
+        "completed": bool(completed),
+    }
+
+
+class SqliteSessionStore:
+    """Session history in SQLite, with the same append/iterate interface as
+    SessionJournal. Timestamps are stored as epoch seconds and rows are
+    streamed from cursors rather than loaded into a list.
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __iter__(self):
+        return self._query("SELECT started, duration, completed FROM sessions "
+                           "ORDER BY started, id")
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def _query(self, sql, params=()):
+        for row in self._db.execute(sql, params):
+            yield _to_record(row)
+
+    def position(self):
+        return self._db.execute("SELECT COALESCE(MAX(id), 0) FROM sessions").fetchone()[0]
+
+    def read_since(self, position):
+        """Rows added after position (a row id), by any instance.
+
+        SQLite does its own locking, so other processes can append at the
+        same time; returns (records, position, False).
+        """
+        rows = self._db.execute(
+            "SELECT id, started, duration, completed FROM sessions "
+            "WHERE id > ? ORDER BY id", (position or 0,)).fetchall()
+        if rows:
+            position = rows[-1][0]
+        return [_to_record(row[1:]) for row in rows], position or 0, False
+
+    def append(self, record):
+        self.extend([record])
+
+    def extend(self, records):
+        rows = ((to_epoch(r.get("started", r.get("date"))),
+                 int(r.get("duration", 0)), int(bool(r.get("completed"))))
+                for r in records)
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO sessions (started, duration, completed) VALUES (?, ?, ?)",
+                rows)
+
+    def migrate(self, journal_path):
+        """Import a JSONL journal once if the database is still empty."""
+        from tidskollen.journal import iter_jsonl
+        journal_path = os.fspath(journal_path)
+        if not os.path.exists(journal_path) or len(self):
+            return
+        self.extend(iter_jsonl(journal_path))
+
+    def between(self, start, end):
+        """Sessions with start time in [start, end)."""
+        return self._query(
+            "SELECT started, duration, completed FROM sessions "
+            "WHERE started >= ? AND started < ? ORDER BY started, id",
+            (to_epoch(start), to_epoch(end)))
+
+    def completion_by_week(self, start=None, end=None):
+        """Yield (week, sessions, completed, rate) with week as ISO "%G-%V"."""
+        sql = ("SELECT " + _ISO_WEEK + " AS week, "
+               "COUNT(*), SUM(completed) FROM sessions")
+        params = []
+        if start is not None:
+            sql += " WHERE started >= ?"
+            params.append(to_epoch(start))
+        if end is not None:
+            sql += " AND" if params else " WHERE"
+            sql += " started < ?"
+            params.append(to_epoch(end))
+        sql += " GROUP BY week ORDER BY week"
+        for week, count, completed in self._db.execute(sql, params):
+            yield week, count, completed, completed / count
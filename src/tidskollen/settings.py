@@ -0,0 +1,28 @@
+"""Application settings stored in ~/.config/tidskollen/settings.json."""
+import json
+import os
+
+from tidskollen import writer
+
+
+def settings_path():
+    xdg = os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
+    d = os.path.join(xdg, "tidskollen")
+    os.makedirs(d, exist_ok=True)
+    return os.path.join(d, "settings.json")
+
+
+def load_settings():
+    p = settings_path()
+    if os.path.exists(p):
+        try:
+            with open(p) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+
+def save_settings(s):
+    """Queue the settings for writing on the background writer."""
+    writer.get_default().write(settings_path(), json.dumps(s, indent=2))
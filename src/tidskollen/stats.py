@@ -0,0 +1,136 @@
+"""Running statistics over the session history.
+
+Totals per day, per week and per preset duration are kept up to date as
+each session is logged, so summaries never need a scan of the history.
+They are saved next to the session data and can be rebuilt in a single
+pass if the saved copy is missing or out of step with the history.
+"""
+import json
+import os
+from datetime import datetime
+
+from tidskollen import writer
+
+VERSION = 2
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def _add(table, key, minutes, completed):
+    row = table.get(key)
+    if row is None:
+        row = table[key] = [0, 0, 0]
+    row[0] += 1
+    row[1] += completed
+    row[2] += minutes
+
+
+class SessionStats:
+    """Per-day, per-week and per-duration [sessions, completed, minutes]."""
+
+    def __init__(self, path=None):
+        self.path = os.fspath(path) if path is not None else None
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.completed = 0
+        self.minutes = 0
+        self.days = {}       # "%Y-%m-%d"
+        self.weeks = {}      # ISO week "%G-%V", as in the exports
+        self.durations = {}  # preset length in minutes
+
+    def __len__(self):
+        return self.count
+
+    def add(self, record):
+        """Fold one session record into the totals."""
+        try:
+            minutes = int(record.get("duration", 0) or 0)
+        except (TypeError, ValueError):
+            minutes = 0  # counted as a session, like one with a bad date
+        completed = int(bool(record.get("completed")))
+        self.count += 1
+        self.completed += completed
+        self.minutes += minutes
+        _add(self.durations, minutes, minutes, completed)
+        try:
+            when = datetime.strptime(record.get("date", ""), DATE_FORMAT)
+        except (TypeError, ValueError):
+            return
+        _add(self.days, when.strftime("%Y-%m-%d"), minutes, completed)
+        _add(self.weeks, when.strftime("%G-%V"), minutes, completed)
+
+    def rebuild(self, sessions):
+        """Recompute everything from an iterable of records in one pass."""
+        self.clear()
+        for record in sessions:
+            self.add(record)
+
+    @property
+    def completion_rate(self):
+        return self.completed / self.count if self.count else 0.0
+
+    def minutes_on(self, when):
+        return self.days.get(when.strftime("%Y-%m-%d"), (0, 0, 0))[2]
+
+    def minutes_in_week(self, when):
+        return self.weeks.get(when.strftime("%G-%V"), (0, 0, 0))[2]
+
+    def top_durations(self, n=3):
+        """The n most used preset lengths in minutes, most used first."""
+        ranked = sorted(self.durations.items(), key=lambda kv: (-kv[1][0], kv[0]))
+        return [minutes for minutes, _row in ranked[:n]]
+
+    def to_data(self):
+        return {
+            "version": VERSION,
+            "count": self.count,
+            "completed": self.completed,
+            "minutes": self.minutes,
+            "days": self.days,
+            "weeks": self.weeks,
+            "durations": {str(k): v for k, v in self.durations.items()},
+        }
+
+    @classmethod
+    def from_data(cls, data, path=None):
+        stats = cls(path)
+        if not isinstance(data, dict) or data.get("version") != VERSION:
+            return None
+        try:
+            stats.count = int(data["count"])
+            stats.completed = int(data["completed"])
+            stats.minutes = int(data["minutes"])
+            stats.days = {k: list(v) for k, v in data["days"].items()}
+            stats.weeks = {k: list(v) for k, v in data["weeks"].items()}
+            stats.durations = {int(k): list(v)
+                               for k, v in data["durations"].items()}
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return None
+        return stats
+
+    @classmethod
+    def load(cls, path, sessions=None):
+        """Load saved totals, rebuilding them from sessions when stale.
+
+        The saved copy is considered in step when its session count matches
+        len(sessions); otherwise it is recomputed and written back.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                stats = cls.from_data(json.load(f), path)
+        except (OSError, ValueError):
+            stats = None
+        if sessions is not None and (stats is None or stats.count != len(sessions)):
+            stats = cls(path)
+            stats.rebuild(sessions)
+            stats.save()
+        return stats if stats is not None else cls(path)
+
+    def save(self):
+        """Queue the totals on the background writer; repeated saves
+        before it gets to them are written once."""
+        if self.path is None:
+            return
+        writer.get_default().write(
+            self.path, json.dumps(self.to_data(), separators=(",", ":")))
@@ -0,0 +1,149 @@
+"""Deadline-based countdown engine, independent of GTK."""
+import math
+import time
+
+
+def _boottime():
+    return time.clock_gettime(time.CLOCK_BOOTTIME)
+
+
+# Like time.monotonic(), but on Linux it keeps counting through suspend so a
+# countdown started before closing the lid has the right time left after.
+monotonic = _boottime if hasattr(time, "CLOCK_BOOTTIME") else time.monotonic
+
+
+class TimerEngine:
+    """Countdown that derives the remaining time from a monotonic clock.
+
+    The engine never counts ticks: it stores the deadline while running and
+    the remaining time while paused, so late wakeups cannot make it drift.
+    Listeners are called as ``callback(engine, event)`` where event is one of
+    "start", "pause", "reset", "seek", "tick" or "finish".
+    """
+
+    def __init__(self, duration=0, clock=monotonic):
+        self._clock = clock
+        self._duration = float(duration)
+        self._deadline = None
+        self._paused_remaining = float(duration)
+        self._last_shown = self.remaining_seconds
+        self._listeners = []
+
+    # ── Subscription ─────────────────────────────────────────
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _emit(self, event):
+        for callback in list(self._listeners):
+            callback(self, event)
+
+    # ── State ────────────────────────────────────────────────
+
+    @property
+    def clock(self):
+        return self._clock
+
+    @property
+    def duration(self):
+        return self._duration
+
+    @property
+    def deadline(self):
+        """Monotonic deadline while running, otherwise None."""
+        return self._deadline
+
+    @property
+    def running(self):
+        return self._deadline is not None
+
+    @property
+    def remaining(self):
+        """Exact remaining time in seconds (float)."""
+        if self._deadline is None:
+            return self._paused_remaining
+        return max(0.0, self._deadline - self._clock())
+
+    @property
+    def remaining_seconds(self):
+        """Remaining whole seconds as shown on screen (rounded up)."""
+        return math.ceil(self.remaining - 1e-9)
+
+    @property
+    def fraction(self):
+        if self._duration <= 0:
+            return 0.0
+        return min(1.0, self.remaining / self._duration)
+
+    @property
+    def finished(self):
+        return self._duration > 0 and self.remaining <= 0
+
+    # ── Transitions ──────────────────────────────────────────
+
+    def reset(self, duration=None):
+        """Stop and rewind, optionally to a new duration."""
+        if duration is not None:
+            self._duration = float(duration)
+        self._deadline = None
+        self._paused_remaining = self._duration
+        self._last_shown = self.remaining_seconds
+        self._emit("reset")
+
+    def start(self):
+        """Start or resume. Returns False if there is nothing to run."""
+        if self._deadline is not None or self._paused_remaining <= 0:
+            return False
+        self._deadline = self._clock() + self._paused_remaining
+        self._emit("start")
+        return True
+
+    def pause(self):
+        if self._deadline is None:
+            return False
+        self._paused_remaining = self.remaining
+        self._deadline = None
+        self._emit("pause")
+        return True
+
+    def seek(self, remaining):
+        """Jump to a new remaining time, keeping the running/paused state."""
+        remaining = min(max(0.0, float(remaining)), self._duration)
+        if self._deadline is not None:
+            self._deadline = self._clock() + remaining
+        else:
+            self._paused_remaining = remaining
+        self._last_shown = self.remaining_seconds
+        self._emit("seek")
+
+    def poll(self):
+        """Check the clock and emit "tick" or "finish" if the shown second changed.
+
+        Returns True while the engine is still running.
+        """
+        if self._deadline is None:
+            return False
+        remaining = self.remaining
+        if remaining <= 0:
+            self._deadline = None
+            self._paused_remaining = 0.0
+            self._last_shown = 0
+            self._emit("finish")
+            return False
+        shown = self.remaining_seconds
+        if shown != self._last_shown:
+            self._last_shown = shown
+            self._emit("tick")
+        return True
+
+    def until_next_second(self):
+        """Seconds until the displayed value next changes, or None if idle."""
+        if self._deadline is None:
+            return None
+        remaining = self.remaining
+        frac = remaining - math.floor(remaining)
+        return frac if frac > 1e-6 else 1.0
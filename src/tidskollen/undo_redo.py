@@ -1,37 +1,133 @@
 """Undo/Redo stack for application state changes."""
+import collections
+import sys
+import time
+
+COALESCE_SECONDS = 1.0
+
+
+def _sizeof(value, _depth=0):
+    """Rough recursive size in bytes of a snapshot or closure."""
+    size = sys.getsizeof(value)
+    if _depth > 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(_sizeof(k, _depth + 1) + _sizeof(v, _depth + 1)
+                    for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_sizeof(v, _depth + 1) for v in value)
+    elif callable(value) and getattr(value, "__closure__", None):
+        size += sum(_sizeof(c.cell_contents, _depth + 1)
+                    for c in value.__closure__ if c.cell_contents is not value)
+    return size
+
+
+class _Step:
+    __slots__ = ("undo", "redo", "description", "key", "time", "size")
+
+    def __init__(self, undo, redo, description, key, when):
+        self.undo = undo
+        self.redo = redo
+        self.description = description
+        self.key = key
+        self.time = when
+        self.size = _sizeof(undo) + _sizeof(redo)
 
 
 class UndoRedoManager:
-    """Simple undo/redo manager with action stack."""
+    """Undo/redo manager with bounded history.
+
+    Steps live in deques, so dropping the oldest is O(1). Besides
+    ``max_size``, an optional ``memory_budget`` (bytes, estimated) also
+    bounds what the undo and redo history keep alive together. Steps
+    pushed with the same ``key`` within COALESCE_SECONDS of each other
+    merge into one: undo returns to the state before the burst, redo to
+    the state after it.
+
+    With a ``restore`` callback, record() stores state snapshots instead of
+    closures: undo calls restore(before) and redo calls restore(after).
+    """
 
-    def __init__(self, max_size=50):
-        self._undo_stack = []
-        self._redo_stack = []
+    def __init__(self, max_size=50, memory_budget=None, restore=None,
+                 clock=time.monotonic):
+        self._undo_stack = collections.deque()
+        self._redo_stack = collections.deque()
         self._max_size = max_size
+        self._budget = memory_budget
+        self._restore = restore
+        self._clock = clock
+        self._size = 0
 
-    def push(self, undo_fn, redo_fn, description=""):
+    def push(self, undo_fn, redo_fn, description="", key=None):
         """Push an undoable action."""
-        self._undo_stack.append((undo_fn, redo_fn, description))
-        if len(self._undo_stack) > self._max_size:
-            self._undo_stack.pop(0)
+        now = self._clock()
+        self._clear_redo()
+        last = self._undo_stack[-1] if self._undo_stack else None
+        if (key is not None and last is not None and last.key == key
+                and now - last.time <= COALESCE_SECONDS):
+            # Keep the oldest undo, take the newest redo.
+            self._size -= last.size
+            last.redo = redo_fn
+            last.description = description
+            last.time = now
+            last.size = _sizeof(last.undo) + _sizeof(redo_fn)
+            self._size += last.size
+        else:
+            step = _Step(undo_fn, redo_fn, description, key, now)
+            self._undo_stack.append(step)
+            self._size += step.size
+        self._evict()
+
+    def record(self, before, after, description="", key=None):
+        """Push a change as two snapshots for the restore callback."""
+        if before == after:
+            return
+        self.push(before, after, description, key)
+
+    def _run(self, action):
+        if self._restore is not None and not callable(action):
+            self._restore(action)
+        else:
+            action()
+
+    def _over_budget(self):
+        return self._budget is not None and self._size > self._budget
+
+    def _evict(self):
+        """Drop the oldest undo steps, then the farthest redo steps, until
+        both limits hold. The step nearest the present is always kept."""
+        while self._undo_stack and (
+                len(self._undo_stack) > self._max_size
+                or (self._over_budget() and len(self._undo_stack) > 1)):
+            self._size -= self._undo_stack.popleft().size
+        keep = 0 if self._undo_stack else 1
+        while len(self._redo_stack) > keep and (
+                len(self._redo_stack) > self._max_size or self._over_budget()):
+            self._size -= self._redo_stack.popleft().size
+
+    def _clear_redo(self):
+        self._size -= sum(step.size for step in self._redo_stack)
         self._redo_stack.clear()
 
     def undo(self):
         """Undo the last action. Returns True if successful."""
         if not self._undo_stack:
             return False
-        undo_fn, redo_fn, desc = self._undo_stack.pop()
-        undo_fn()
-        self._redo_stack.append((undo_fn, redo_fn, desc))
+        step = self._undo_stack.pop()
+        self._run(step.undo)
+        step.key = None  # never coalesce into a step that was undone
+        self._redo_stack.append(step)
+        self._evict()
         return True
 
     def redo(self):
         """Redo the last undone action. Returns True if successful."""
         if not self._redo_stack:
             return False
-        undo_fn, redo_fn, desc = self._redo_stack.pop()
-        redo_fn()
-        self._undo_stack.append((undo_fn, redo_fn, desc))
+        step = self._redo_stack.pop()
+        self._run(step.redo)
+        self._undo_stack.append(step)
+        self._evict()
         return True
 
     def can_undo(self):
@@ -40,6 +136,18 @@ class UndoRedoManager:
     def can_redo(self):
         return bool(self._redo_stack)
 
+    def undo_description(self):
+        return self._undo_stack[-1].description if self._undo_stack else None
+
+    def redo_description(self):
+        return self._redo_stack[-1].description if self._redo_stack else None
+
+    @property
+    def memory_used(self):
+        """Estimated bytes held by the undo and redo history."""
+        return self._size
+
     def clear(self):
         self._undo_stack.clear()
         self._redo_stack.clear()
+        self._size = 0
@@ -1,7 +1,7 @@
 """Main window for Tidskollen - Visual Time Timer."""
-import json
-import math
 import gettext
+import math
+import threading
 from datetime import datetime
 from pathlib import Path
 
@@ -12,10 +12,47 @@ from gi.repository import Gtk, Adw, Gio, GLib, Gdk
 
 _ = gettext.gettext
 
-from tidskollen.export import show_export_dialog
+from tidskollen.dial import DialPainter, dial_geometry, smooth_frame_rate
+from tidskollen import scheduler
+from tidskollen.checkpoint import RUNNING, CheckpointFile, TimerCheckpoint
+from tidskollen.settings import load_settings
+from tidskollen.timer import TimerEngine
+from tidskollen.undo_redo import UndoRedoManager
 
 PRESET_TIMES = [1, 2, 5, 10, 15, 20, 30, 45, 60]
 
+# Toplevel states in which nothing of the window reaches the screen.
+_HIDDEN_STATES = (Gdk.ToplevelState.MINIMIZED
+                  | getattr(Gdk.ToplevelState, "SUSPENDED", 0))
+
+
+def follow_dark_theme(area, painter):
+    """Keep painter's theme in step with the style manager's dark mode.
+
+    The style manager outlives every widget, so the handler is only held
+    while area is realized; otherwise it would keep a closed window alive.
+    """
+    handler = None
+
+    def on_theme_changed(style, *_args):
+        painter.set_theme(style.get_dark())
+        area.queue_draw()
+
+    def on_realize(_area):
+        nonlocal handler
+        style = Adw.StyleManager.get_default()
+        handler = style.connect("notify::dark", on_theme_changed)
+        on_theme_changed(style)
+
+    def on_unrealize(_area):
+        nonlocal handler
+        if handler is not None:
+            Adw.StyleManager.get_default().disconnect(handler)
+            handler = None
+
+    area.connect("realize", on_realize)
+    area.connect("unrealize", on_unrealize)
+
 
 class TimerDrawingArea(Gtk.DrawingArea):
     def __init__(self):
@@ -23,72 +60,133 @@ class TimerDrawingArea(Gtk.DrawingArea):
         self.fraction = 1.0  # 1.0 = full, 0.0 = done
         self.total_seconds = 0
         self.remaining_seconds = 0
+        self._painter = DialPainter()
+        self._engine = None
+        self._values = None
+        self._span = None
+        self._smooth = False
+        self._shown = True
+        self._frame_source = None
+        self._fps = 0
         self.set_draw_func(self._draw)
         self.set_hexpand(True)
         self.set_vexpand(True)
+        self.connect("map", lambda *_: self._update_animation())
+        self.connect("unmap", lambda *_: self._update_animation())
+        follow_dark_theme(self, self._painter)
+
+    @property
+    def smooth(self):
+        return self._smooth
+
+    def bind_engine(self, engine, values=None, span=None):
+        """Follow a TimerEngine so smooth mode can interpolate between seconds.
+
+        values(exact) returns (fraction, shown seconds) and span() the
+        seconds one full dial stands for; by default both come straight
+        from the engine.
+        """
+        self._engine = engine
+        self._values = values or (lambda exact: (engine.fraction,
+                                                 engine.remaining_seconds))
+        self._span = span or (lambda: engine.duration)
+        engine.subscribe(lambda *_: self._update_animation())
+        self._update_animation()
+
+    def set_smooth(self, enabled):
+        self._smooth = enabled
+        self._update_animation()
+
+    def set_zoom(self, zoom):
+        """Scale the digits with the UI zoom; only a redraw is needed."""
+        self._painter.text_scale = zoom
+        self.queue_draw()
+
+    def set_shown(self, shown):
+        """Tell the dial whether its toplevel is minimized or suspended."""
+        self._shown = shown
+        self._update_animation()
+
+    def _update_animation(self):
+        """Run the frame timeout only while smooth, running and on screen."""
+        wanted = (self._smooth and self._engine is not None
+                  and self._engine.running and self._shown
+                  and self.get_mapped())
+        if wanted and self._frame_source is None:
+            self._start_frames()
+        elif not wanted and self._frame_source is not None:
+            GLib.source_remove(self._frame_source)
+            self._frame_source = None
+
+    def _frame_rate(self):
+        _cx, _cy, radius = dial_geometry(self.get_width(), self.get_height())
+        return smooth_frame_rate(radius, self._span())
+
+    def _start_frames(self):
+        # A timeout rather than a tick callback: a tick callback keeps the
+        # frame clock running at the display's refresh rate even when most
+        # frames are skipped, which is what slow machines cannot afford.
+        self._fps = self._frame_rate()
+        interval = 1000 // self._fps if self._fps else 1000
+        self._frame_source = GLib.timeout_add(interval, self._on_frame)
+
+    def _on_frame(self):
+        self.fraction, self.remaining_seconds = self._values(True)
+        self.queue_draw()
+        if self._frame_rate() != self._fps:
+            self._start_frames()  # resized or next segment: new interval
+            return GLib.SOURCE_REMOVE
+        return GLib.SOURCE_CONTINUE
 
     def _draw(self, area, cr, width, height):
-        center_x = width / 2
-        center_y = height / 2
-        radius = min(width, height) / 2 - 20
-
-        if radius < 10:
-            return
-
-        # Background circle (green = done)
-        cr.set_source_rgb(0.15, 0.65, 0.40)
-        cr.arc(center_x, center_y, radius, 0, 2 * math.pi)
-        cr.fill()
-
-        # Remaining time wedge (red)
-        if self.fraction > 0.001:
-            # Interpolate red→green
-            r = 0.75 * self.fraction + 0.15 * (1 - self.fraction)
-            g = 0.11 * self.fraction + 0.65 * (1 - self.fraction)
-            b = 0.18 * self.fraction + 0.40 * (1 - self.fraction)
-            cr.set_source_rgb(r, g, b)
-            start_angle = -math.pi / 2
-            end_angle = start_angle + 2 * math.pi * self.fraction
-            cr.move_to(center_x, center_y)
-            cr.arc(center_x, center_y, radius, start_angle, end_angle)
-            cr.close_path()
-            cr.fill()
-
-        # Border
-        cr.set_source_rgb(0.5, 0.5, 0.5)
-        cr.set_line_width(3)
-        cr.arc(center_x, center_y, radius, 0, 2 * math.pi)
-        cr.stroke()
-
-        # Time text
-        mins = self.remaining_seconds // 60
-        secs = self.remaining_seconds % 60
-        text = f"{mins}:{secs:02d}"
-        cr.set_source_rgb(1, 1, 1)
-        cr.select_font_face("Sans", 0, 1)
-        font_size = radius * 0.4
-        cr.set_font_size(font_size)
-        extents = cr.text_extents(text)
-        cr.move_to(center_x - extents.width / 2, center_y + extents.height / 2)
-        cr.show_text(text)
+        self._painter.paint(cr, width, height, self.fraction, self.remaining_seconds,
+                            self.get_scale_factor())
 
 
 class TidskollenWindow(Adw.ApplicationWindow):
     def __init__(self, **kwargs):
         super().__init__(**kwargs, default_width=450, default_height=600,
                          title=_("Time Check"))
-        self.running = False
         self.total_seconds = 300  # default 5 min
-        self.remaining = self.total_seconds
-        self.timer_id = None
-        self.sessions = self._load_sessions()
+        self.engine = TimerEngine(self.total_seconds)
+        self.engine.subscribe(self._on_engine_event)
+        self.schedule = None
+        self._segment_index = -1
+        self._history = UndoRedoManager(restore=self._restore_timer)
+        self._profiles = None
+        self._net = None
+        self._server = None
+        self._server_starting = False
+        self._follower = None
+        self._shown = False  # mapped and neither minimized nor suspended
+        self._scheduler = scheduler.get_default()
+        self._timer_sub = self._scheduler.subscribe(self._tick, active=False)
+        self.sessions = []
+        self.session_partitions = None
+        self._partition = None
+        self.session_store = None
+        self.session_stats = None
+        self._pending_sessions = []
+        self._sessions_error = None
         self._build_ui()
         self._setup_shortcuts()
         self._start_clock()
+        self._checkpoint = CheckpointFile(
+            Path(GLib.get_user_config_dir()) / "tidskollen" / "timer.state")
+        self._restoring = True
+        self._restore_checkpoint()
+        self._restoring = False
+        self.connect("realize", self._on_realize)
+        self.connect("map", self._on_visibility_changed)
+        self.connect("unmap", self._on_visibility_changed)
+        self.connect("destroy", self._on_destroy)
+        # Low priority so the first frame is painted before history loads.
+        GLib.idle_add(self._load_sessions_async, priority=GLib.PRIORITY_LOW)
 
     def _build_ui(self):
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        self.set_content(main_box)
+        self.toast_overlay = Adw.ToastOverlay(child=main_box)
+        self.set_content(self.toast_overlay)
 
         header = Adw.HeaderBar()
         main_box.append(header)
@@ -109,6 +207,11 @@ class TidskollenWindow(Adw.ApplicationWindow):
         header.pack_end(export_btn)
 
         menu = Gio.Menu()
+        menu.append(_("Schedule…"), "win.schedule")
+        menu.append(_("Stations"), "win.stations")
+        menu.append(_("Share Timer on Network"), "win.share")
+        menu.append(_("Follow Shared Timer…"), "win.follow")
+        menu.append(_("Smooth Animation"), "win.smooth")
         menu.append(_("Export Sessions"), "win.export")
         menu.append(_("Keyboard Shortcuts"), "app.shortcuts")
         menu.append(_("About Time Check"), "app.about")
@@ -120,46 +223,81 @@ class TidskollenWindow(Adw.ApplicationWindow):
         export_action.connect("activate", self._on_export)
         self.add_action(export_action)
 
+        schedule_action = Gio.SimpleAction.new("schedule", None)
+        schedule_action.connect("activate", self._on_schedule)
+        self.add_action(schedule_action)
+
+        share_action = Gio.SimpleAction.new_stateful(
+            "share", None, GLib.Variant.new_boolean(False))
+        share_action.connect("change-state", self._on_share_changed)
+        self.add_action(share_action)
+
+        follow_action = Gio.SimpleAction.new("follow", None)
+        follow_action.connect("activate", self._on_follow)
+        self.add_action(follow_action)
+
+        stations_action = Gio.SimpleAction.new("stations", None)
+        stations_action.connect("activate", self._on_stations)
+        self.add_action(stations_action)
+
+        smooth_action = Gio.SimpleAction.new_stateful(
+            "smooth", None, GLib.Variant.new_boolean(False))
+        smooth_action.connect("change-state", self._on_smooth_changed)
+        self.add_action(smooth_action)
+
+        # Current schedule segment, hidden without a schedule
+        self.segment_label = Gtk.Label(visible=False)
+        self.segment_label.add_css_class("title-2")
+        self.segment_label.set_margin_top(8)
+        main_box.append(self.segment_label)
+
         # Timer display
         self.timer_area = TimerDrawingArea()
         self.timer_area.total_seconds = self.total_seconds
         self.timer_area.remaining_seconds = self.remaining
+        self.timer_area.bind_engine(self.engine, self._dial_values, self._dial_span)
         main_box.append(self.timer_area)
 
         # Preset buttons
-        preset_box = Gtk.Box(spacing=4, halign=Gtk.Align.CENTER)
-        preset_box.set_margin_top(8)
-        preset_box.set_margin_bottom(4)
+        self.preset_box = Gtk.Box(spacing=4, halign=Gtk.Align.CENTER)
+        self.preset_box.set_margin_top(8)
+        self.preset_box.set_margin_bottom(4)
         for mins in PRESET_TIMES:
             btn = Gtk.Button(label=f"{mins}m")
             btn.connect("clicked", self._on_preset, mins)
-            preset_box.append(btn)
-        main_box.append(preset_box)
+            self.preset_box.append(btn)
+        main_box.append(self.preset_box)
 
         # Controls
-        ctrl_box = Gtk.Box(spacing=12, halign=Gtk.Align.CENTER)
-        ctrl_box.set_margin_top(8)
-        ctrl_box.set_margin_bottom(8)
+        self.ctrl_box = Gtk.Box(spacing=12, halign=Gtk.Align.CENTER)
+        self.ctrl_box.set_margin_top(8)
+        self.ctrl_box.set_margin_bottom(8)
 
         self.start_btn = Gtk.Button(label=_("Start"))
         self.start_btn.add_css_class("suggested-action")
         self.start_btn.add_css_class("pill")
         self.start_btn.connect("clicked", self._on_start)
-        ctrl_box.append(self.start_btn)
+        self.ctrl_box.append(self.start_btn)
 
         self.stop_btn = Gtk.Button(label=_("Stop"))
         self.stop_btn.add_css_class("destructive-action")
         self.stop_btn.add_css_class("pill")
         self.stop_btn.set_sensitive(False)
         self.stop_btn.connect("clicked", self._on_stop)
-        ctrl_box.append(self.stop_btn)
+        self.ctrl_box.append(self.stop_btn)
 
         reset_btn = Gtk.Button(label=_("Reset"))
         reset_btn.add_css_class("pill")
         reset_btn.connect("clicked", self._on_reset)
-        ctrl_box.append(reset_btn)
+        self.ctrl_box.append(reset_btn)
 
-        main_box.append(ctrl_box)
+        self.skip_btn = Gtk.Button(icon_name="media-skip-forward-symbolic",
+                                   tooltip_text=_("Next activity"), visible=False)
+        self.skip_btn.add_css_class("circular")
+        self.skip_btn.connect("clicked", self._on_skip)
+        self.ctrl_box.append(self.skip_btn)
+
+        main_box.append(self.ctrl_box)
 
         # Status
         self.status_label = Gtk.Label(label="", xalign=0)
@@ -168,56 +306,356 @@ class TidskollenWindow(Adw.ApplicationWindow):
         self.status_label.set_margin_bottom(4)
         main_box.append(self.status_label)
 
+    @property
+    def running(self):
+        return self.engine.running
+
+    @property
+    def remaining(self):
+        return self.engine.remaining_seconds
+
     def _on_preset(self, btn, mins):
         if not self.running:
+            before = self._timer_snapshot()
+            self._set_schedule(None)
             self.total_seconds = mins * 60
-            self.remaining = self.total_seconds
-            self._update_display()
+            self.engine.reset(self.total_seconds)
+            self._history.record(before, self._timer_snapshot(),
+                                 _("Set %d minutes") % mins, key="preset")
 
     def _on_start(self, btn):
-        if not self.running and self.remaining > 0:
-            self.running = True
-            self.start_btn.set_sensitive(False)
-            self.stop_btn.set_sensitive(True)
-            self.timer_id = GLib.timeout_add(1000, self._tick)
+        self.engine.start()
 
     def _on_stop(self, btn):
-        self.running = False
-        self.start_btn.set_sensitive(True)
-        self.stop_btn.set_sensitive(False)
-        if self.timer_id:
-            GLib.source_remove(self.timer_id)
-            self.timer_id = None
+        self.engine.pause()
 
     def _on_reset(self, btn):
-        self._on_stop(btn)
-        self.remaining = self.total_seconds
+        before = self._timer_snapshot()
+        self.engine.reset(self.total_seconds)
+        self._history.record(before, self._timer_snapshot(), _("Reset"), key="reset")
+
+    # ── Undo ─────────────────────────────────────────────────
+
+    def _timer_snapshot(self):
+        schedule = self.schedule.to_data() if self.schedule is not None else None
+        return (self.total_seconds, self.engine.remaining, schedule)
+
+    def _restore_timer(self, snapshot):
+        from tidskollen.schedule import Schedule
+        total, remaining, schedule = snapshot
+        self.engine.pause()
+        if schedule is not None:
+            self._set_schedule(Schedule.from_data(schedule))
+        else:
+            self._set_schedule(None)
+            self.total_seconds = total
+            self.engine.reset(total)
+        self.engine.seek(remaining)
+
+    def _on_undo(self, redo=False):
+        if self._follower is not None:
+            return
+        history = self._history
+        description = history.redo_description() if redo else history.undo_description()
+        if not (history.redo() if redo else history.undo()):
+            return
+        self.toast_overlay.add_toast(Adw.Toast.new(
+            (_("Redo: %s") if redo else _("Undo: %s")) % description))
+
+    def _on_engine_event(self, engine, event):
+        if event in ("start", "pause", "reset", "finish"):
+            self.start_btn.set_sensitive(not engine.running)
+            self.stop_btn.set_sensitive(engine.running)
+        self._arm_timer()
         self._update_display()
+        # A follower's timer belongs to the leader: neither checkpoint it
+        # (a restart would resume it as our own) nor pass it on.
+        if event != "tick" and not self._restoring and self._follower is None:
+            self._save_checkpoint()
+            self._publish(event)
+        self._emit_plugin_hook("on_timer_" + event, engine)
+        if event == "finish":
+            if self._follower is None:
+                self._log_session(completed=True)
+            self._on_timer_done()
 
     def _tick(self):
-        if not self.running:
+        """Called by the shared scheduler when the shown second changes."""
+        self.engine.poll()
+        self._arm_timer()
+
+    def _arm_timer(self):
+        """Wake when the engine's own shown second next changes, or only at
+        its deadline while the window is hidden.
+
+        The countdown started at an arbitrary point within a wall-clock
+        second, so waking on the scheduler's wall-clock seconds would show
+        every value late by that phase.
+        """
+        engine = self.engine
+        if not engine.running:
+            self._timer_sub.set_deadline(None)
+        elif self._shown:
+            self._timer_sub.set_deadline(engine.clock() + engine.until_next_second())
+        else:
+            self._timer_sub.set_deadline(engine.deadline)
+
+    def _on_realize(self, *_args):
+        self.get_surface().connect("notify::state", self._on_visibility_changed)
+
+    def _is_shown(self):
+        if not self.get_mapped():
             return False
-        self.remaining -= 1
-        if self.remaining <= 0:
-            self.remaining = 0
-            self.running = False
-            self.start_btn.set_sensitive(True)
-            self.stop_btn.set_sensitive(False)
+        surface = self.get_surface()
+        return surface is None or not surface.get_state() & _HIDDEN_STATES
+
+    def _on_visibility_changed(self, *_args):
+        # While nobody can see the window the countdown only wakes up at its
+        # deadline; coming back catches up with a single redraw.
+        shown = self._is_shown()
+        if shown == self._shown:
+            return
+        self._shown = shown
+        self._clock_sub.set_active(shown)
+        self._arm_timer()
+        self.timer_area.set_shown(shown)
+        if shown:
+            self._update_clock()
             self._update_display()
-            self._log_session(completed=True)
-            self._on_timer_done()
-            return False
-        self._update_display()
-        return True
+
+    def _on_destroy(self, *_args):
+        self._clock_sub.cancel()
+        self._timer_sub.cancel()
+        if self._net is not None:
+            if self._follower is not None:
+                self._net.call(self._follower.stop)
+            if self._server is not None:
+                self._net.submit(self._server.close())
+
+    def _dial_values(self, exact=False):
+        """(fraction, shown seconds) for the dial; per segment in a schedule."""
+        remaining = self.engine.remaining
+        total = self.total_seconds
+        if self.schedule is not None:
+            index, remaining = self.schedule.locate(self.schedule.total - remaining)
+            total = self.schedule.segments[index].seconds
+        shown = math.ceil(remaining - 1e-9)
+        if total <= 0:
+            return 0, shown
+        return (remaining if exact else shown) / total, shown
+
+    def _dial_span(self):
+        """Seconds a full dial stands for: the current segment's length."""
+        if self.schedule is None:
+            return self.total_seconds
+        index, _left = self.schedule.locate(self.schedule.total - self.engine.remaining)
+        return self.schedule.segments[index].seconds
 
     def _update_display(self):
-        if self.total_seconds > 0:
-            self.timer_area.fraction = self.remaining / self.total_seconds
-        else:
-            self.timer_area.fraction = 0
-        self.timer_area.remaining_seconds = self.remaining
+        if not self._shown:
+            return
+        values = self._dial_values(self.timer_area.smooth)
+        self.timer_area.fraction, self.timer_area.remaining_seconds = values
+        if self.schedule is not None:
+            self._update_segment()
         self.timer_area.queue_draw()
 
+    # ── Checkpoint ───────────────────────────────────────────
+
+    def _save_checkpoint(self):
+        profiles = self._profile_manager()
+        self._checkpoint.save(TimerCheckpoint.capture(
+            self.engine, self._segment_index, profiles.current,
+            self.schedule is not None))
+
+    def _restore_checkpoint(self):
+        """Bring back the countdown that was running when we last exited."""
+        cp = self._checkpoint.load()
+        if cp is None or cp.duration <= 0:
+            return
+        if cp.schedule and cp.profile is not None:
+            from tidskollen.schedule import Schedule
+            profiles = self._profile_manager()
+            self._switch_profile(cp.profile)
+            schedule = Schedule.from_data(profiles.load_data().get("schedule", []))
+            if schedule.total == cp.duration:
+                self._set_schedule(schedule)
+        if self.schedule is None:
+            self.total_seconds = int(cp.duration)
+            self.engine.reset(self.total_seconds)
+        remaining = cp.remaining()
+        if remaining <= 0:
+            return  # finished: come back ready to start again
+        self.engine.seek(remaining)
+        if cp.state == RUNNING and remaining > 0:
+            self.engine.start()
+
+    # ── Network sharing ──────────────────────────────────────
+
+    def _net_loop(self):
+        if self._net is None:
+            from tidskollen.broadcast import LoopThread
+            self._net = LoopThread()
+        return self._net
+
+    def _on_share_changed(self, action, value):
+        from tidskollen.broadcast import BroadcastServer
+        net = self._net_loop()
+        if value.get_boolean() and self._server is None:
+            if self._server_starting:
+                return
+            # Binding happens on the network thread; finish on the main loop.
+            self._server_starting = True
+            server = BroadcastServer()
+            net.submit(server.start()).add_done_callback(
+                lambda future: GLib.idle_add(self._on_share_started, action,
+                                             server, future))
+            return
+        if not value.get_boolean() and self._server is not None:
+            net.submit(self._server.close())
+            self._server = None
+        action.set_state(value)
+
+    def _on_share_started(self, action, server, future):
+        self._server_starting = False
+        try:
+            port = future.result()
+        except Exception as e:
+            self.toast_overlay.add_toast(
+                Adw.Toast.new(_("Could not share timer: %s") % e))
+            return GLib.SOURCE_REMOVE
+        self._server = server
+        action.set_state(GLib.Variant.new_boolean(True))
+        self._publish("share")
+        self.toast_overlay.add_toast(
+            Adw.Toast.new(_("Sharing timer on port %d") % port))
+        return GLib.SOURCE_REMOVE
+
+    def _publish(self, event):
+        if self._server is None:
+            return
+        from tidskollen.broadcast import timer_state
+        schedule = self.schedule.to_data() if self.schedule is not None else None
+        self._net.call(self._server.publish,
+                       timer_state(self.engine, event, schedule))
+
+    def _on_follow(self, *args):
+        if self._follower is not None:
+            self._net.call(self._follower.stop)
+            self._follower = None
+            self._set_following(False)
+            return
+        dialog = Adw.AlertDialog.new(_("Follow Shared Timer"),
+                                     _("Address of the sharing computer:"))
+        entry = Gtk.Entry(placeholder_text="192.168.1.10")
+        dialog.set_extra_child(entry)
+        dialog.add_response("cancel", _("Cancel"))
+        dialog.add_response("follow", _("Follow"))
+        dialog.set_response_appearance("follow", Adw.ResponseAppearance.SUGGESTED)
+        dialog.set_default_response("follow")
+        dialog.connect("response", self._on_follow_response, entry)
+        dialog.present(self)
+
+    def _on_follow_response(self, dialog, response, entry):
+        if response != "follow" or not entry.get_text().strip():
+            return
+        from tidskollen.broadcast import BroadcastFollower, parse_address
+        host, port = parse_address(entry.get_text())
+        follower = BroadcastFollower(
+            host, port, lambda state: GLib.idle_add(self._on_remote_state, state),
+            on_connection=lambda connected, error: GLib.idle_add(
+                self._on_follow_connection, follower, connected, error))
+        self._follower = follower
+        self._net_loop().call(follower.start)
+        self._set_following(True)
+
+    def _on_follow_connection(self, follower, connected, error):
+        if follower is not self._follower:
+            return GLib.SOURCE_REMOVE
+        if connected:
+            message = _("Connected to shared timer")
+        elif error is not None:
+            message = _("Cannot reach shared timer at %(host)s: %(error)s. Retrying…") % {
+                "host": follower.host, "error": error}
+        else:
+            message = _("Shared timer at %s went away. Retrying…") % follower.host
+        self.toast_overlay.add_toast(Adw.Toast.new(message))
+        return GLib.SOURCE_REMOVE
+
+    def _set_following(self, following):
+        self.ctrl_box.set_sensitive(not following)
+        self.preset_box.set_sensitive(not following)
+        self.toast_overlay.add_toast(Adw.Toast.new(
+            _("Following shared timer") if following
+            else _("Stopped following shared timer")))
+
+    def _on_remote_state(self, state):
+        if self._follower is None:
+            return GLib.SOURCE_REMOVE
+        from tidskollen.broadcast import apply_state
+        from tidskollen.schedule import Schedule
+        data = state.get("schedule")
+        schedule = Schedule.from_data(data) if data else None
+        if (schedule is None) != (self.schedule is None) or (
+                schedule is not None and schedule.to_data() != self.schedule.to_data()):
+            self._set_schedule(schedule)
+        self.total_seconds = int(state["duration"])
+        apply_state(self.engine, state)
+        return GLib.SOURCE_REMOVE
+
+    # ── Schedules ────────────────────────────────────────────
+
+    def _profile_manager(self):
+        if self._profiles is None:
+            from tidskollen.profiles import ProfileManager
+            self._profiles = ProfileManager("tidskollen")
+        return self._profiles
+
+    def _on_schedule(self, *args):
+        from tidskollen.scheduledialog import show_schedule_dialog
+        data = self._profile_manager().load_data()
+        show_schedule_dialog(self, data.get("schedule", []), self._on_schedule_start)
+
+    def _on_schedule_start(self, segments):
+        from tidskollen.schedule import Schedule
+        schedule = Schedule.from_data(segments)
+        profiles = self._profile_manager()
+        data = profiles.load_data()
+        data["schedule"] = schedule.to_data()
+        profiles.save_data(data)
+        if not len(schedule):
+            return
+        self._set_schedule(schedule)
+        self.engine.start()
+
+    def _set_schedule(self, schedule):
+        self.schedule = schedule
+        self._segment_index = -1
+        self.segment_label.set_visible(schedule is not None)
+        self.skip_btn.set_visible(schedule is not None)
+        if schedule is not None:
+            self.total_seconds = schedule.total
+            self.engine.reset(self.total_seconds)
+
+    def _update_segment(self):
+        schedule = self.schedule
+        index, _left = schedule.locate(schedule.total - self.engine.remaining)
+        if index == self._segment_index:
+            return
+        if self._segment_index >= 0 and self.running:
+            self.toast_overlay.add_toast(
+                Adw.Toast.new(_("Next: %s") % schedule.segments[index].label))
+        self._segment_index = index
+        self.segment_label.set_label("%s (%d/%d)" % (
+            schedule.segments[index].label, index + 1, len(schedule)))
+
+    def _on_skip(self, btn):
+        if self.schedule is None:
+            return
+        remaining = self.schedule.next_remaining(self.engine.remaining)
+        if remaining is not None:
+            self.engine.seek(remaining)
+
     def _on_timer_done(self):
         dialog = Adw.MessageDialog(
             transient_for=self,
@@ -237,39 +675,149 @@ class TidskollenWindow(Adw.ApplicationWindow):
             if keyval == Gdk.KEY_e or keyval == Gdk.KEY_E:
                 self._on_export()
                 return True
+            if keyval in (Gdk.KEY_z, Gdk.KEY_Z):
+                self._on_undo(redo=bool(state & Gdk.ModifierType.SHIFT_MASK))
+                return True
+            if keyval in (Gdk.KEY_y, Gdk.KEY_Y):
+                self._on_undo(redo=True)
+                return True
         return False
 
-    def _sessions_path(self):
-        p = Path(GLib.get_user_config_dir()) / "tidskollen"
-        p.mkdir(parents=True, exist_ok=True)
-        return p / "sessions.json"
-
-    def _load_sessions(self):
-        path = self._sessions_path()
-        if path.exists():
+    def _session_partitions(self):
+        if self.session_partitions is None:
+            from tidskollen.partitions import SessionPartitions
+            root = Path(GLib.get_user_config_dir()) / "tidskollen"
+            root.mkdir(parents=True, exist_ok=True)
+            self.session_partitions = SessionPartitions(
+                root, load_settings().get("session_backend"))
+        return self.session_partitions
+
+    def _load_sessions_async(self):
+        """Open the current profile's history on a worker thread."""
+        partitions = self._session_partitions()
+        profile = self._profile_manager().current
+
+        def worker():
             try:
-                return json.loads(path.read_text())
-            except Exception:
-                pass
-        return []
-
-    def _save_sessions(self):
-        self._sessions_path().write_text(
-            json.dumps(self.sessions, indent=2, ensure_ascii=False))
+                partition = partitions.get(profile)
+            except Exception as e:
+                GLib.idle_add(self._on_sessions_failed, profile, e)
+                return
+            GLib.idle_add(self._on_sessions_loaded, partition)
+
+        self._sessions_error = None
+        threading.Thread(target=worker, daemon=True).start()
+        return GLib.SOURCE_REMOVE
+
+    def _on_sessions_failed(self, profile, error):
+        if profile != self._profile_manager().current:
+            return GLib.SOURCE_REMOVE
+        # Nothing can be written until the store opens, so stop queueing.
+        self._sessions_error = error
+        lost = len(self._pending_sessions)
+        self._pending_sessions = []
+        message = _("Could not load session history: %s") % error
+        if lost:
+            message += " " + _("(%d sessions not saved)") % lost
+        self.toast_overlay.add_toast(Adw.Toast.new(message))
+        return GLib.SOURCE_REMOVE
+
+    def _on_sessions_loaded(self, partition):
+        if partition.profile != self._profile_manager().current:
+            return GLib.SOURCE_REMOVE  # switched again while loading
+        self._partition = partition
+        self.session_store = partition.store
+        self.sessions = partition.sessions
+        self.session_stats = partition.stats
+        pending, self._pending_sessions = self._pending_sessions, []
+        for record in pending:
+            self._append_session(partition, record)
+        return GLib.SOURCE_REMOVE
+
+    def _append_session(self, partition, record):
+        partition.append(record, lambda records, rebuilt: GLib.idle_add(
+            self._merge_sessions, partition, records, rebuilt))
+
+    def _merge_sessions(self, partition, records, rebuilt):
+        """Take in sessions read back from the store, ours or another
+        instance's."""
+        partition.merge(records, rebuilt)
+        if partition is self._partition:
+            self.sessions = partition.sessions
+            self.session_stats = partition.stats
+        return GLib.SOURCE_REMOVE
+
+    def _switch_profile(self, name):
+        """Make name the current profile; its history loads on demand."""
+        profiles = self._profile_manager()
+        if name == profiles.current:
+            return
+        profiles.switch(name)
+        self._partition = None
+        self.session_store = None
+        self.session_stats = None
+        self.sessions = []
+        if self.session_partitions is not None:
+            self._load_sessions_async()
 
     def _log_session(self, completed):
-        self.sessions.append({
+        record = {
             "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
             "duration": self.total_seconds // 60,
             "completed": completed,
-        })
-        # Keep last 200 sessions
-        self.sessions = self.sessions[-200:]
-        self._save_sessions()
+            "profile": self._profile_manager().current,
+        }
+        if self._sessions_error is not None:
+            self.toast_overlay.add_toast(Adw.Toast.new(
+                _("Session not saved: %s") % self._sessions_error))
+        elif self._partition is None:
+            self._pending_sessions.append(record)
+        else:
+            self._append_session(self._partition, record)
+        self._emit_plugin_hook("on_session_logged", record)
+
+    def _emit_plugin_hook(self, hook, *args):
+        plugins = getattr(self.get_application(), "plugins", None)
+        if plugins is not None and plugins.has(hook):
+            plugins.emit(hook, *args)
 
     def _on_export(self, *args):
-        show_export_dialog(self, self.sessions,
-                          lambda msg: self.status_label.set_label(msg))
+        partition = self._partition
+        if partition is None:
+            self._show_export()
+            return
+
+        # Catch up with sessions other instances logged, off the main loop.
+        def worker():
+            try:
+                records, rebuilt = partition.read_new()
+            except Exception as e:
+                # Export what we have rather than nothing at all.
+                GLib.idle_add(self._on_catch_up_failed, e)
+            else:
+                GLib.idle_add(self._merge_sessions, partition, records, rebuilt)
+            GLib.idle_add(self._show_export)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_catch_up_failed(self, error):
+        self.toast_overlay.add_toast(Adw.Toast.new(
+            _("Could not read new sessions: %s") % error))
+        return GLib.SOURCE_REMOVE
+
+    def _show_export(self):
+        from tidskollen.export import show_export_dialog
+        show_export_dialog(self, self.sessions)
+        return GLib.SOURCE_REMOVE
+
+    def _on_stations(self, *args):
+        from tidskollen.multiwindow import MultiTimerWindow
+        MultiTimerWindow(application=self.get_application()).present()
+
+    def _on_smooth_changed(self, action, value):
+        action.set_state(value)
+        self.timer_area.set_smooth(value.get_boolean())
+        self._update_display()
 
     def _toggle_theme(self, btn):
         mgr = Adw.StyleManager.get_default()
@@ -279,10 +827,11 @@ class TidskollenWindow(Adw.ApplicationWindow):
             mgr.set_color_scheme(Adw.ColorScheme.FORCE_DARK)
 
     def _start_clock(self):
-        GLib.timeout_add_seconds(1, self._update_clock)
+        self._clock_sub = self._scheduler.subscribe(self._update_clock, active=False)
         self._update_clock()
 
     def _update_clock(self):
+        if not self._shown:
+            return
         now = GLib.DateTime.new_now_local()
         self.status_label.set_label(now.format("%Y-%m-%d %H:%M:%S"))
-        return True
@@ -0,0 +1,183 @@
+"""One background thread for all of the app's file writes.
+
+Home directories on NFS can take a noticeable time to write and fsync, so
+nothing on the GTK main thread touches the disk directly. Callers hand
+the writer whole-file contents, which are coalesced per path (only the
+newest contents are written) and replaced atomically, or small jobs such
+as journal appends. Work is collected for a short moment and then written
+as one batch: every file is written and fsynced, then renamed into place,
+and each directory involved is fsynced once.
+"""
+import collections
+import os
+import tempfile
+import threading
+
+BATCH_DELAY = 0.2
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_default():
+    """Return the process-wide writer, starting it on first use."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = BackgroundWriter()
+        return _default
+
+
+def _write_temp(path, data):
+    """Write data to a new temp file next to path and return its name.
+
+    Each write gets its own file, so two app instances saving the same
+    path can never rename each other's half-written data into place.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".",
+                               prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            mode = 0o644  # mkstemp's 0600 would differ from a plain open()
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, "wb") as f:
+            fd = None
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        if fd is not None:
+            os.close(fd)
+        _remove(tmp)
+        raise
+    return tmp
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _fsync_path(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class BackgroundWriter:
+    def __init__(self, delay=BATCH_DELAY):
+        self._delay = delay
+        self._cond = threading.Condition()
+        self._files = {}  # path -> (bytes, [done callbacks])
+        self._jobs = collections.deque()  # (fn, args, path to fsync)
+        self._busy = False
+        self._urgent = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="tidskollen-writer",
+                                        daemon=True)
+        self._thread.start()
+
+    def write(self, path, data, done=None):
+        """Replace path with data (str or bytes). A later write() of the same
+        path before this one reaches the disk supersedes it. done(path), if
+        given, is called on the writer thread once the contents are in place.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        path = os.fspath(path)
+        with self._cond:
+            _old, callbacks = self._files.get(path, (None, []))
+            if done is not None:
+                callbacks.append(done)
+            self._files[path] = (data, callbacks)
+            self._cond.notify_all()
+
+    def call(self, fn, *args, fsync=None):
+        """Run fn(*args) on the writer thread, in order with other calls.
+        If fsync names a file it is fsynced once with the rest of the batch.
+        """
+        with self._cond:
+            self._jobs.append((fn, args, os.fspath(fsync) if fsync else None))
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is on disk."""
+        with self._cond:
+            self._urgent = True
+            self._cond.notify_all()
+            return self._cond.wait_for(
+                lambda: not (self._files or self._jobs or self._busy), timeout)
+
+    def close(self, timeout=None):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._files or self._jobs or self._closed)
+                if self._closed and not (self._files or self._jobs):
+                    return
+                # Let a burst of saves pile up into one batch.
+                self._cond.wait_for(lambda: self._urgent or self._closed, self._delay)
+                self._urgent = False
+                files, self._files = self._files, {}
+                jobs, self._jobs = self._jobs, collections.deque()
+                self._busy = True
+            try:
+                self._write_batch(files, jobs)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _write_batch(self, files, jobs):
+        to_sync = set()
+        for fn, args, path in jobs:
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"Background write failed: {e}")
+                continue
+            if path is not None:
+                to_sync.add(path)
+        for path in to_sync:
+            _fsync_path(path)
+
+        written = []
+        for path, (data, callbacks) in files.items():
+            try:
+                tmp = _write_temp(path, data)
+            except OSError as e:
+                print(f"Could not write {path}: {e}")
+                continue
+            written.append((tmp, path, callbacks))
+        dirs = set()
+        for tmp, path, callbacks in written:
+            try:
+                os.replace(tmp, path)
+            except OSError as e:
+                print(f"Could not write {path}: {e}")
+                _remove(tmp)
+                continue
+            dirs.add(os.path.dirname(path) or ".")
+            for done in callbacks:
+                try:
+                    done(path)
+                except Exception as e:
+                    print(f"Write callback for {path} failed: {e}")
+        for d in dirs:
+            _fsync_path(d)
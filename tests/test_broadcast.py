@@ -0,0 +1,181 @@
+"""Leader and followers talking over localhost."""
+import asyncio
+
+import pytest
+
+from tidskollen.bench import FakeClock
+from tidskollen.broadcast import (BroadcastFollower, BroadcastServer, apply_state,
+                                  parse_address, timer_state)
+from tidskollen.timer import TimerEngine
+
+FOLLOWERS = 5
+
+
+async def _wait_for(predicate, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def _follow(port, received, **kwargs):
+    follower = BroadcastFollower("127.0.0.1", port, received.append, retry=0.05,
+                                 **kwargs)
+    follower.start()
+    return follower
+
+
+def test_followers_receive_every_state_change():
+    async def main():
+        server = BroadcastServer("127.0.0.1", 0)
+        port = await server.start()
+        inboxes = [[] for _ in range(FOLLOWERS)]
+        followers = [_follow(port, inbox) for inbox in inboxes]
+        await _wait_for(lambda: len(server) == FOLLOWERS)
+
+        clock = FakeClock()
+        engine = TimerEngine(60, clock=clock)
+        engine.subscribe(lambda e, event: server.publish(timer_state(e, event)))
+        engine.start()
+        clock.advance(10)
+        engine.pause()
+        engine.seek(5)
+        engine.start()
+        clock.advance(5)
+        engine.poll()
+
+        events = ["start", "pause", "seek", "start", "finish"]
+        await _wait_for(lambda: all(len(inbox) == len(events) for inbox in inboxes))
+        for inbox in inboxes:
+            assert [state["event"] for state in inbox] == events
+            assert inbox[1]["remaining"] == pytest.approx(50)
+            assert inbox[2]["remaining"] == pytest.approx(5)
+            assert inbox[-1]["remaining"] == 0
+        for follower in followers:
+            follower.stop()
+        await server.close()
+
+    asyncio.run(main())
+
+
+def test_late_joiner_gets_the_last_state():
+    async def main():
+        server = BroadcastServer("127.0.0.1", 0)
+        port = await server.start()
+        server.publish({"event": "pause", "duration": 60, "remaining": 42,
+                        "running": False, "schedule": None})
+        received = []
+        follower = _follow(port, received)
+        await _wait_for(lambda: received)
+        assert received[0]["remaining"] == 42
+        follower.stop()
+        await server.close()
+
+    asyncio.run(main())
+
+
+def test_follower_reconnects_after_server_restart():
+    async def main():
+        server = BroadcastServer("127.0.0.1", 0)
+        port = await server.start()
+        received, links = [], []
+        follower = _follow(port, received,
+                           on_connection=lambda up, error: links.append(up))
+        await _wait_for(lambda: len(server) == 1)
+        await server.close()
+        await _wait_for(lambda: links[-1] is False)
+
+        server = BroadcastServer("127.0.0.1", port)
+        await server.start()
+        await _wait_for(lambda: len(server) == 1)
+        server.publish({"event": "start", "duration": 60, "remaining": 60,
+                        "running": True, "schedule": None})
+        await _wait_for(lambda: received)
+        assert links == [True, False, True]
+        follower.stop()
+        await server.close()
+
+    asyncio.run(main())
+
+
+def test_follower_survives_an_oversized_line():
+    async def main():
+        connections = []
+
+        async def on_client(reader, writer):
+            connections.append(writer)
+            if len(connections) == 1:
+                writer.write(b"x" * (200 * 1024) + b"\n")  # over the 64 KiB limit
+            else:
+                writer.write(b'{"event": "pause"}\n')
+            await writer.drain()
+            await reader.read()
+
+        server = await asyncio.start_server(on_client, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        received, links = [], []
+        follower = _follow(port, received,
+                           on_connection=lambda up, error: links.append((up, error)))
+        await _wait_for(lambda: received)
+        assert received == [{"event": "pause"}]
+        assert isinstance(links[1][1], ValueError)
+        follower.stop()
+        for writer in connections:
+            writer.close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("10.0.0.5", ("10.0.0.5", 47474)),
+    ("10.0.0.5:9000", ("10.0.0.5", 9000)),
+    ("::1", ("::1", 47474)),
+    ("[::1]:9000", ("::1", 9000)),
+    ("[fe80::1]", ("fe80::1", 47474)),
+])
+def test_parse_address(text, expected):
+    assert parse_address(text) == expected
+
+
+def _follower_engine(clock):
+    engine = TimerEngine(60, clock=clock)
+    events = []
+    engine.subscribe(lambda e, event: events.append(event))
+    return engine, events
+
+
+FINISH = {"event": "finish", "duration": 60, "remaining": 0, "running": False}
+
+
+def test_finish_message_finishes_a_running_follower_once():
+    clock = FakeClock()
+    engine, events = _follower_engine(clock)
+    apply_state(engine, {"event": "start", "duration": 60, "remaining": 60,
+                         "running": True})
+    clock.advance(59.99)  # the message beats our own deadline
+    apply_state(engine, FINISH)
+    clock.advance(1)
+    engine.poll()
+    assert events.count("finish") == 1
+    assert not engine.running
+
+
+def test_finish_after_own_deadline_is_not_repeated():
+    clock = FakeClock()
+    engine, events = _follower_engine(clock)
+    engine.start()
+    clock.advance(61)
+    engine.poll()  # our own deadline wins
+    apply_state(engine, FINISH)
+    assert events == ["start", "finish"]
+
+
+def test_joining_after_the_end_shows_zero_quietly():
+    clock = FakeClock()
+    engine, events = _follower_engine(clock)
+    apply_state(engine, FINISH)
+    assert engine.remaining == 0
+    assert "finish" not in events
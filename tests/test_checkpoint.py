@@ -0,0 +1,105 @@
+"""Checkpoint records and the schedule arithmetic a restore relies on."""
+import time
+
+import pytest
+
+from tidskollen.checkpoint import (IDLE, PAUSED, RECORD, RUNNING, CheckpointFile,
+                                   TimerCheckpoint)
+from tidskollen.schedule import Schedule, Segment
+
+
+def test_record_is_68_bytes():
+    assert RECORD.size == 68
+
+
+def test_pack_unpack_round_trip():
+    cp = TimerCheckpoint(PAUSED, 1500.0, 612.5, 3, "Klassrum 4B", True)
+    data = cp.pack()
+    assert len(data) == RECORD.size
+    back = TimerCheckpoint.unpack(data)
+    assert (back.state, back.duration, back.value, back.segment, back.profile,
+            back.schedule) == (PAUSED, 1500.0, 612.5, 3, "Klassrum 4B", True)
+
+
+@pytest.mark.parametrize("offset", [0, 4, 8, 20, 40, 60, 67])
+def test_corrupted_byte_is_rejected(offset):
+    data = bytearray(TimerCheckpoint(RUNNING, 60.0, 1e9).pack())
+    data[offset] ^= 0xFF
+    assert TimerCheckpoint.unpack(bytes(data)) is None
+
+
+@pytest.mark.parametrize("size", [0, 10, RECORD.size - 1, RECORD.size + 1])
+def test_torn_or_padded_record_is_rejected(size):
+    data = TimerCheckpoint().pack()
+    data = (data + b"\0")[:size]
+    assert TimerCheckpoint.unpack(data) is None
+
+
+def test_long_profile_name_comes_back_as_none():
+    cp = TimerCheckpoint(profile="ett väldigt långt profilnamn för skolan")
+    assert TimerCheckpoint.unpack(cp.pack()).profile is None
+
+
+def test_running_checkpoint_past_its_deadline_has_nothing_left():
+    cp = TimerCheckpoint(RUNNING, 600.0, time.time() - 30)
+    assert TimerCheckpoint.unpack(cp.pack()).remaining() == 0
+
+
+def test_paused_checkpoint_keeps_its_remaining():
+    assert TimerCheckpoint(PAUSED, 600.0, 42.0).remaining() == 42.0
+
+
+def test_missing_or_short_file_loads_as_none(tmp_path):
+    path = tmp_path / "timer.ckpt"
+    assert CheckpointFile(path).load() is None
+    path.write_bytes(TimerCheckpoint(IDLE, 60.0, 60.0).pack()[:30])
+    assert CheckpointFile(path).load() is None
+
+
+def _schedule(*seconds):
+    return Schedule(Segment(str(i), s) for i, s in enumerate(seconds))
+
+
+def test_zero_length_segments_are_dropped():
+    schedule = _schedule(0, 60, 0, 30, 0)
+    assert len(schedule) == 2
+    assert schedule.total == 90
+    assert [s.label for s in schedule.segments] == ["1", "3"]
+
+
+def test_empty_schedule():
+    schedule = _schedule(0, 0)
+    assert schedule.total == 0
+    assert schedule.locate(0) == (-1, 0.0)
+
+
+@pytest.mark.parametrize("elapsed, expected", [
+    (0, (0, 60)),
+    (59.5, (0, 0.5)),
+    (60, (1, 30)),
+    (89, (1, 1)),
+    (95, (2, 5)),
+    (100, (2, 0)),
+    (200, (2, 0)),  # past the end stays on the last segment
+])
+def test_locate(elapsed, expected):
+    schedule = _schedule(60, 30, 10)
+    index, left = schedule.locate(elapsed)
+    assert (index, left) == (expected[0], pytest.approx(expected[1]))
+
+
+def test_start_of():
+    schedule = _schedule(60, 30, 10)
+    assert [schedule.start_of(i) for i in range(3)] == [0, 60, 90]
+
+
+@pytest.mark.parametrize("remaining, expected", [
+    (100, 40),   # start of the first segment skips to the second
+    (45, 40),
+    (40, 10),    # exactly at a boundary: skip the segment that just began
+    (25, 10),
+    (10, None),  # last segment has nothing after it
+    (3, None),
+])
+def test_next_remaining(remaining, expected):
+    assert _schedule(60, 30, 10).next_remaining(remaining) == expected
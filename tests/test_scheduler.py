@@ -0,0 +1,61 @@
+"""The shared scheduler waking a countdown on its own seconds."""
+import pytest
+
+from tidskollen.bench import FakeClock, FakeLoop
+from tidskollen.scheduler import SecondScheduler
+from tidskollen.timer import TimerEngine
+
+
+def _setup(start):
+    clock = FakeClock(start)
+    loop = FakeLoop(clock)
+    sched = SecondScheduler(clock=clock, monotonic=clock,
+                            timeout_add=loop.timeout_add,
+                            source_remove=loop.source_remove)
+    return clock, loop, sched
+
+
+@pytest.mark.parametrize("phase", [0.0, 0.3, 0.7, 0.999])
+def test_countdown_ticks_on_engine_seconds(phase):
+    clock, loop, sched = _setup(1000 + phase)
+    engine = TimerEngine(10, clock=clock)
+    ticks = []
+    engine.subscribe(lambda e, event: event in ("tick", "finish")
+                     and ticks.append((clock(), e.remaining_seconds)))
+
+    def arm():
+        if engine.running:
+            timer.set_deadline(clock() + engine.until_next_second())
+
+    timer = sched.subscribe(lambda: (engine.poll(), arm()), active=False)
+    started = clock()
+    engine.start()
+    arm()
+    loop.run(12)
+
+    assert [shown for _when, shown in ticks] == list(range(9, -1, -1))
+    for n, (when, _shown) in enumerate(ticks, 1):
+        # Each value changes right at the engine's own second boundary,
+        # not at the next wall-clock second.
+        assert 0 <= when - (started + n) < 0.002
+
+
+def test_active_subscriptions_wake_on_wall_clock_seconds():
+    clock, loop, sched = _setup(1000.3)
+    calls = []
+    sched.subscribe(lambda: calls.append(clock()))
+    loop.run(3)
+    assert [round(t % 1, 2) for t in calls] == [0.0, 0.0, 0.0]
+
+
+def test_hidden_countdown_wakes_only_at_its_deadline():
+    clock, loop, sched = _setup(1000.3)
+    engine = TimerEngine(30, clock=clock)
+    finished = []
+    engine.subscribe(lambda e, event: event == "finish" and finished.append(clock()))
+    timer = sched.subscribe(engine.poll, active=False)
+    engine.start()
+    timer.set_deadline(engine.deadline)
+    loop.run(60)
+    assert sched.wakeups == 1
+    assert finished and finished[0] - 1030.3 < 0.002
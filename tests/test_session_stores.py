@@ -0,0 +1,82 @@
+"""Several processes appending to one session store at the same time."""
+import multiprocessing
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from tidskollen.journal import SessionJournal
+from tidskollen.sessionbin import BinarySessionStore
+from tidskollen.sessiondb import SqliteSessionStore
+
+PROCESSES = 4
+RECORDS = 300
+
+STORES = {
+    "jsonl": ("sessions.jsonl", SessionJournal),
+    "sqlite": ("sessions.db", SqliteSessionStore),
+    "binary": ("sessions.bin", BinarySessionStore),
+}
+
+
+def _append_many(backend, path, worker):
+    store = STORES[backend][1](path)
+    for i in range(RECORDS):
+        # The duration identifies the record: worker * RECORDS + i.
+        store.append({"date": "2026-03-02 08:%02d" % (i % 60),
+                      "duration": worker * RECORDS + i,
+                      "completed": i % 2 == 0})
+
+
+def _run_workers(backend, path):
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_append_many, args=(backend, path, n))
+               for n in range(PROCESSES)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(60)
+        assert p.exitcode == 0
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+@pytest.mark.parametrize("backend", sorted(STORES))
+def test_concurrent_appends_are_all_kept(backend, tmp_path):
+    name, store_class = STORES[backend]
+    path = str(tmp_path / name)
+    store = store_class(path)
+    _records, position, _reset = store.read_since(None)
+
+    _run_workers(backend, path)
+
+    expected = list(range(PROCESSES * RECORDS))
+    assert sorted(int(r["duration"]) for r in store_class(path)) == expected
+    # A follower that was reading before the appends sees each one once.
+    records, _position, _reset = store.read_since(position)
+    assert sorted(int(r["duration"]) for r in records) == expected
+
+
+def _history():
+    day = datetime(2025, 12, 20, 8, 0)
+    for i in range(400):
+        yield {"date": (day + timedelta(hours=7 * i)).strftime("%Y-%m-%d %H:%M"),
+               "duration": (5, 10, 20)[i % 3], "completed": i % 4 != 0}
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "binary"])
+@pytest.mark.parametrize("start, end", [
+    (datetime(2025, 12, 29), datetime(2026, 1, 5)),
+    (datetime(2026, 1, 1, 10, 0), datetime(2026, 1, 1, 23, 59)),
+    (datetime(2020, 1, 1), datetime(2030, 1, 1)),
+    (datetime(2030, 1, 1), datetime(2031, 1, 1)),
+])
+def test_between_matches_a_list_filter(backend, start, end, tmp_path):
+    name, store_class = STORES[backend]
+    store = store_class(str(tmp_path / name))
+    history = list(_history())
+    store.extend(history)
+    first, last = start.strftime("%Y-%m-%d %H:%M"), end.strftime("%Y-%m-%d %H:%M")
+    expected = [r for r in history if first <= r["date"] < last]
+    got = [{k: r[k] for k in ("date", "duration", "completed")}
+           for r in store.between(start, end)]
+    assert got == expected
@@ -0,0 +1,64 @@
+"""Running totals and weekly completion across ISO-year boundaries."""
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+from tidskollen.sessionbin import BinarySessionStore
+from tidskollen.sessiondb import SqliteSessionStore
+from tidskollen.stats import SessionStats
+
+STORES = {"sqlite": ("sessions.db", SqliteSessionStore),
+          "binary": ("sessions.bin", BinarySessionStore)}
+
+
+def test_bad_records_do_not_break_a_rebuild():
+    stats = SessionStats()
+    stats.rebuild([
+        {"date": "2026-03-02 08:00", "duration": 25, "completed": True},
+        {"date": "2026-03-02 09:00", "duration": "abc", "completed": True},
+        {"date": "2026-03-02 10:00", "duration": [5], "completed": False},
+        {"date": "not a date", "duration": 10, "completed": False},
+        {"duration": None},
+    ])
+    assert stats.count == 5
+    assert stats.completed == 2
+    assert stats.minutes == 35
+    assert stats.days["2026-03-02"] == [3, 2, 25]
+
+
+def _around_new_year(year):
+    day = datetime(year, 12, 24, 7, 30)
+    for i in range(120):
+        yield {"date": (day + timedelta(hours=3 * i)).strftime("%Y-%m-%d %H:%M"),
+               "duration": 10, "completed": i % 3 != 0}
+
+
+def _tally(records):
+    count, done = Counter(), Counter()
+    for r in records:
+        week = datetime.strptime(r["date"], "%Y-%m-%d %H:%M").strftime("%G-%V")
+        count[week] += 1
+        done[week] += r["completed"]
+    return [(w, count[w], done[w]) for w in sorted(count)]
+
+
+@pytest.mark.parametrize("backend", sorted(STORES))
+@pytest.mark.parametrize("year", [2019, 2020, 2021, 2024, 2026])
+def test_completion_by_week_matches_iso_weeks(backend, year, tmp_path):
+    name, store_class = STORES[backend]
+    store = store_class(str(tmp_path / name))
+    records = list(_around_new_year(year))
+    store.extend(records)
+    got = [(w, n, d) for w, n, d, _rate in store.completion_by_week()]
+    assert got == _tally(records)
+    if year == 2020:
+        assert "2020-53" in [w for w, _n, _d in got]
+
+
+@pytest.mark.parametrize("year", [2020, 2026])
+def test_stats_weeks_match_iso_weeks(year):
+    records = list(_around_new_year(year))
+    stats = SessionStats()
+    stats.rebuild(records)
+    assert sorted((w, n, d) for w, (n, d, _m) in stats.weeks.items()) == _tally(records)
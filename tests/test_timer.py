@@ -0,0 +1,129 @@
+"""TimerEngine driven by a fake clock."""
+import pytest
+
+from tidskollen.bench import FakeClock, drift_engine
+from tidskollen.timer import TimerEngine
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def events():
+    return []
+
+
+@pytest.fixture
+def engine(clock, events):
+    engine = TimerEngine(60, clock=clock)
+    engine.subscribe(lambda e, event: events.append(event))
+    return engine
+
+
+def test_counts_down_from_the_clock(engine, clock):
+    assert engine.start()
+    clock.advance(12.5)
+    assert engine.remaining == pytest.approx(47.5)
+    assert engine.remaining_seconds == 48
+    assert engine.fraction == pytest.approx(47.5 / 60)
+
+
+def test_start_twice_is_refused(engine):
+    assert engine.start()
+    assert not engine.start()
+
+
+def test_pause_freezes_and_resume_continues(engine, clock, events):
+    engine.start()
+    clock.advance(10)
+    assert engine.pause()
+    clock.advance(100)
+    assert engine.remaining == pytest.approx(50)
+    assert not engine.running
+    assert engine.start()
+    clock.advance(5)
+    assert engine.remaining == pytest.approx(45)
+    assert events == ["start", "pause", "start"]
+
+
+def test_pause_when_stopped_is_refused(engine, events):
+    assert not engine.pause()
+    assert events == []
+
+
+def test_seek_while_running_moves_the_deadline(engine, clock):
+    engine.start()
+    clock.advance(5)
+    engine.seek(20)
+    assert engine.running
+    assert engine.deadline == pytest.approx(clock() + 20)
+    clock.advance(1)
+    assert engine.remaining == pytest.approx(19)
+
+
+def test_seek_while_paused_is_clamped(engine):
+    engine.seek(500)
+    assert engine.remaining == 60
+    engine.seek(-3)
+    assert engine.remaining == 0
+    assert not engine.running
+
+
+def test_reset_rewinds_to_a_new_duration(engine, clock, events):
+    engine.start()
+    clock.advance(30)
+    engine.reset(120)
+    assert not engine.running
+    assert engine.duration == 120
+    assert engine.remaining == 120
+    assert events[-1] == "reset"
+
+
+def test_poll_ticks_once_per_shown_second(engine, clock, events):
+    engine.start()
+    clock.advance(0.4)
+    assert engine.poll()
+    assert events == ["start"]  # still shows 1:00
+    clock.advance(0.6)
+    assert engine.poll()
+    assert engine.poll()
+    assert events == ["start", "tick"]
+    assert engine.until_next_second() == pytest.approx(1.0)
+
+
+def test_finish_is_emitted_once(engine, clock, events):
+    engine.start()
+    clock.advance(61)
+    assert not engine.poll()
+    assert not engine.poll()
+    assert events == ["start", "finish"]
+    assert engine.finished
+    assert not engine.running
+    assert engine.remaining == 0
+
+
+def test_finished_engine_cannot_start_until_reset(engine, clock):
+    engine.start()
+    clock.advance(60)
+    engine.poll()
+    assert not engine.start()
+    engine.reset()
+    assert engine.start()
+
+
+def test_seek_to_zero_finishes_on_next_poll(engine, events):
+    engine.start()
+    engine.seek(0)
+    assert not engine.poll()
+    assert events == ["start", "seek", "finish"]
+
+
+@pytest.mark.parametrize("minutes", [1, 10, 60])
+def test_late_wakeups_do_not_accumulate(minutes):
+    # Every wakeup is up to 50 ms late, yet the timer finishes at most
+    # one wakeup's lateness after its deadline, however long it runs.
+    drift, wakeups = drift_engine(minutes * 60, max_late_ms=50, seed=minutes)
+    assert 0 <= drift <= 0.05 + 0.001
+    assert wakeups <= minutes * 60 + 1
@@ -0,0 +1,127 @@
+"""Bounded, coalescing undo history."""
+import random
+
+from tidskollen.bench import FakeClock
+from tidskollen.undo_redo import COALESCE_SECONDS, UndoRedoManager
+
+
+class Value:
+    """A number that can be set through the history."""
+
+    def __init__(self, history):
+        self.value = 0
+        self.history = history
+
+    def set(self, value, key=None):
+        before, self.value = self.value, value
+
+        def undo():
+            self.value = before
+
+        def redo():
+            self.value = value
+
+        self.history.push(undo, redo, f"set {value}", key)
+
+
+def test_oldest_steps_are_dropped_past_max_size():
+    history = UndoRedoManager(max_size=3)
+    v = Value(history)
+    for n in range(1, 6):
+        v.set(n)
+    while history.undo():
+        pass
+    assert v.value == 2  # steps 1 and 2 were evicted
+
+
+def test_memory_budget_bounds_undo_and_redo():
+    clock = FakeClock()
+    history = UndoRedoManager(max_size=1000, memory_budget=20000,
+                              restore=lambda s: None, clock=clock)
+    rng = random.Random(7)
+    state = []
+    for i in range(300):
+        clock.advance(2)
+        roll = rng.random()
+        if roll < 0.6:
+            before, state = state, state + [i] * rng.randrange(1, 200)
+            history.record(list(before), list(state), key="edit")
+        elif roll < 0.8:
+            history.undo()
+        else:
+            history.redo()
+        held = len(history._undo_stack) + len(history._redo_stack)
+        assert history.memory_used <= 20000 or held == 1
+    assert history.memory_used == sum(
+        s.size for s in list(history._undo_stack) + list(history._redo_stack))
+
+
+def test_a_single_step_over_budget_is_kept():
+    history = UndoRedoManager(memory_budget=10, restore=lambda s: None)
+    history.record([], list(range(100)))
+    assert history.can_undo()
+    history.undo()
+    assert history.can_redo()
+
+
+def test_steps_with_the_same_key_coalesce_within_a_second():
+    clock = FakeClock()
+    history = UndoRedoManager(clock=clock)
+    v = Value(history)
+    for n in range(1, 6):
+        v.set(n, key="drag")
+        clock.advance(COALESCE_SECONDS / 2)
+    clock.advance(COALESCE_SECONDS * 2)
+    v.set(10, key="drag")  # too late to join the burst
+    assert history.undo() and v.value == 5
+    assert history.undo() and v.value == 0
+    assert not history.can_undo()
+    assert history.redo() and v.value == 5
+    assert history.redo() and v.value == 10
+
+
+def test_different_keys_do_not_coalesce():
+    history = UndoRedoManager(clock=FakeClock())
+    v = Value(history)
+    v.set(1, key="a")
+    v.set(2, key="b")
+    v.set(3)
+    v.set(4)
+    assert sum(1 for _ in iter(history.undo, False)) == 4
+
+
+def test_no_coalescing_into_an_undone_step():
+    clock = FakeClock()
+    history = UndoRedoManager(clock=clock)
+    v = Value(history)
+    v.set(1, key="k")
+    v.set(2, key="k")
+    history.undo()
+    history.redo()
+    v.set(3, key="k")  # same key, same instant, but after an undo
+    assert history.undo() and v.value == 2
+    assert history.undo() and v.value == 0
+
+
+def test_record_restores_snapshots():
+    restored = []
+    history = UndoRedoManager(restore=restored.append)
+    history.record({"minutes": 5}, {"minutes": 10}, "5 → 10")
+    history.record({"minutes": 10}, {"minutes": 10})  # no change, no step
+    assert history.undo_description() == "5 → 10"
+    history.undo()
+    assert restored == [{"minutes": 5}]
+    assert not history.can_undo()
+    history.redo()
+    assert restored == [{"minutes": 5}, {"minutes": 10}]
+
+
+def test_push_clears_redo_and_its_memory():
+    history = UndoRedoManager(restore=lambda s: None)
+    history.record([1], [2])
+    history.record([2], [3])
+    history.undo()
+    history.undo()
+    history.record([1], [9])
+    assert not history.can_redo()
+    assert history.memory_used == history._undo_stack[0].size